@@ -0,0 +1,76 @@
+from src.argparser.settings import Settings
+from src.evaluation import Evaluator
+
+from pathlib import Path
+
+from pydantic import (
+    Field,
+    FilePath,
+    field_validator,
+)
+
+from src.objects import (
+    FinderConfiguration,
+    RThetaBins,
+    Spreads,
+    Thresholds,
+    Tolerances,
+)
+
+
+class EvaluationArgs(Settings, cli_prog_name="Evaluation"):
+    __OUTPUT = Path("./evaluations")
+
+    inputs: list[FilePath] = Field(
+        description="HDF5 files made by generate_data.py, containing the raw"
+        " data and the true lines",
+        validation_alias="inputs",
+    )
+    configurations: list[FinderConfiguration] = Field(
+        [
+            FinderConfiguration(
+                name="default",
+                bins=RThetaBins(r=500, theta=500),
+                line_width=1.0,
+                spreads=Spreads(xy=5, rtheta=15),
+                thresholds=Thresholds(xy=1.0, rtheta=5.0),
+            )
+        ],
+        description="The LinesFinder configurations to evaluate",
+        validation_alias="configurations",
+    )
+    tolerances: Tolerances = Field(
+        Tolerances(r=2.0, theta=0.05),
+        validation_alias="tolerances",
+    )
+    output: Path = Field(
+        "evaluation.csv",
+        description="The CSV file to save the evaluation in. It will be located"
+        " in ./evaluations/",
+        validation_alias="output",
+    )
+
+    @field_validator("output", mode="before")
+    def handle_output(cls, path: str) -> Path:
+        path = cls.__OUTPUT.default / path
+        if path.is_dir():
+            raise ValueError("Output path must be a file, not a directory")
+        if not path.suffix == ".csv":
+            path = path.with_suffix(".csv")
+        if not path.parent.is_dir():
+            path.parent.mkdir(parents=True)
+        return path
+
+
+def main() -> None:
+    args = EvaluationArgs()
+    print("Using args", args)
+
+    evaluator = Evaluator(args.inputs, args.configurations, args.tolerances)
+    table = evaluator.evaluate()
+    table.to_csv(args.output, index=False)
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
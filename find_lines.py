@@ -1,5 +1,7 @@
 from src.argparser.settings import Settings
 from src.linefinder import LinesFinder
+from src.linefinder.tiled import TiledLinesFinder
+from src.pipeline import Pipeline
 
 from pathlib import Path
 
@@ -7,10 +9,22 @@ from pydantic import (
     AliasChoices,
     Field,
     FilePath,
+    NonNegativeInt,
+    PositiveInt,
     field_validator,
 )
 
-from src.objects import RThetaBins, Spreads, Thresholds
+from src.cache import StageCache
+from src.results import ResultsStore
+from src.objects import (
+    Precision,
+    RBinning,
+    RThetaBins,
+    Spreads,
+    Thresholds,
+    Tolerances,
+    XYBins,
+)
 
 
 class LineFinderArgs(Settings, cli_prog_name="LinesFinder"):
@@ -38,12 +52,94 @@ class LineFinderArgs(Settings, cli_prog_name="LinesFinder"):
         Thresholds(xy=1.0, rtheta=5.0),
         validation_alias="thresholds",
     )
+    precision: Precision = Field(
+        Precision.DOUBLE,
+        description="Numeric precision of the pipeline: 'float32' runs point"
+        " finding and trigonometry in single precision and stores the"
+        " accumulator as unsigned integers",
+        validation_alias="precision",
+    )
+    r_binning: RBinning = Field(
+        RBinning.POINTS,
+        description="Range of the r bins of the accumulator: 'points' spans the"
+        " r values of the points, 'image' -diagonal to +diagonal of the image"
+        " and 'fixed' the given r range. The last two give the same bins to"
+        " every image of the same shape",
+        validation_alias=AliasChoices("r-binning", "r_binning"),
+    )
+    r_range: tuple[float, float] | None = Field(
+        None,
+        description="Range of the r bins, only given with the 'fixed' r binning",
+        validation_alias=AliasChoices("r-range", "r_range"),
+    )
     output: Path = Field(
         "",
         description="The file name to save the lines in. It will be located"
         " in ./found_lines/",
         validation_alias="output",
     )
+    # Declared after 'output' so that they do not end up in the output name
+    cache_dir: Path | None = Field(
+        None,
+        description="Directory of the cache of intermediate stages. Reruns with"
+        " the same input and early-stage parameters resume from the cache",
+        validation_alias=AliasChoices("cache-dir", "cache_dir"),
+    )
+    cache_size: PositiveInt = Field(
+        2**30,
+        description="Maximum size of the cache in bytes. The least recently"
+        " used entries are evicted beyond it",
+        validation_alias=AliasChoices("cache-size", "cache_size"),
+    )
+    results: Path | None = Field(
+        None,
+        description="HDF5 results store to append the found lines to, instead of"
+        " writing found_rtheta.hdf5 in the output directory",
+        validation_alias="results",
+    )
+    plot: bool = Field(
+        False,
+        description="Also write the plots in the output directory when the lines"
+        " go to a results store. Without a store, the plots are always written",
+        validation_alias="plot",
+    )
+    tile: XYBins | None = Field(
+        None,
+        description="Size of the tiles to split the image in, each with its own"
+        " local Hough transform. The whole image is used if not given",
+        validation_alias="tile",
+    )
+    overlap: NonNegativeInt = Field(
+        0,
+        description="Number of pixels shared by neighbouring tiles",
+        validation_alias="overlap",
+    )
+    merge: Tolerances = Field(
+        Tolerances(r=2.0, theta=0.05),
+        description="Lines found in different tiles are merged if most of"
+        " their points are within r of each other, and refitted. Lines without"
+        " points are compared where they were found, theta within theta",
+        validation_alias="merge",
+    )
+    workers: PositiveInt | None = Field(
+        None,
+        description="Number of processes running the tiles. Defaults to the"
+        " number of CPUs",
+        validation_alias="workers",
+    )
+    inputs: list[FilePath] = Field(
+        [],
+        description="More HDF5 files to find lines in after 'input'. The files"
+        " are then read, processed and written in a pipeline, each in its own"
+        " sub-directory of the output named after its position and file name",
+        validation_alias="inputs",
+    )
+    queue_depth: PositiveInt = Field(
+        2,
+        description="Maximum number of files waiting between two stages of the"
+        " pipeline",
+        validation_alias=AliasChoices("queue-depth", "queue_depth"),
+    )
 
     @field_validator("output", mode="before")
     def handle_output(cls, path: str, values) -> Path:
@@ -63,9 +159,7 @@ class LineFinderArgs(Settings, cli_prog_name="LinesFinder"):
             path = cls.__OUTPUT.default / path
             if path.is_file():
                 raise ValueError("Output path must be a directory, not a file")
-
-        if not path.is_dir():
-            path.mkdir(parents=True)
+        # Created by the finder, only if something is written in it
         return path
 
 
@@ -73,15 +167,61 @@ def main() -> None:
     args = LineFinderArgs()
     print("Using args", args)
 
+    if args.tile is not None and args.inputs:
+        raise ValueError("Tiles can only be used with a single input")
     lines_finder = LinesFinder(
-        data=args.input,
+        data=None if args.inputs else args.input,
         thresholds=args.thresholds,
         output=args.output,
         bins=args.bins,
         line_width=args.line_width,
         spreads=args.spreads,
+        precision=args.precision,
+        r_binning=args.r_binning,
+        r_range=args.r_range,
+        cache=(
+            StageCache(args.cache_dir, args.cache_size)
+            if args.cache_dir is not None
+            else None
+        ),
+        results=ResultsStore(args.results) if args.results is not None else None,
+        plot=args.results is None or args.plot,
     )
-    lines_finder.find()
+    if args.inputs:
+        run_pipeline(lines_finder, [args.input, *args.inputs], args)
+    elif args.tile is not None:
+        tiled_finder = TiledLinesFinder(
+            lines_finder, args.tile, args.overlap, args.merge, args.workers
+        )
+        tiled_finder.find()
+    else:
+        lines_finder.find()
+
+
+def run_pipeline(
+    lines_finder: LinesFinder, inputs: list[Path], args: LineFinderArgs
+) -> None:
+    def load(index_and_path: tuple[int, Path]) -> LinesFinder:
+        # Inputs may share their file name, e.g. the data.hdf5 of generate_data
+        index, path = index_and_path
+        finder = lines_finder.with_data(path)
+        finder.output = args.output / f"{index}_{path.stem}"
+        return finder
+
+    def compute(finder: LinesFinder):
+        return finder, finder.compute()
+
+    def save(finder_and_result) -> None:
+        finder, result = finder_and_result
+        print(f"{finder.source}:")
+        if result is None:
+            print("No points found")
+            return
+        finder.save(*result)
+
+    pipeline = Pipeline(load, compute, save, args.queue_depth)
+    pipeline.run(enumerate(inputs))
+    print("Pipeline metrics", pipeline.metrics())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import AliasChoices, Field, PositiveInt
+
+from src.argparser.settings import Settings
+from src.cache import StageCache
+
+
+class CacheArgs(Settings, cli_prog_name="Cache"):
+    cache_dir: Path = Field(
+        Path("./cache"),
+        description="Directory of the cache of intermediate stages",
+        validation_alias=AliasChoices("cache-dir", "cache_dir"),
+    )
+    cache_size: PositiveInt = Field(
+        2**30,
+        description="Maximum size of the cache in bytes",
+        validation_alias=AliasChoices("cache-size", "cache_size"),
+    )
+    clear: bool = Field(
+        False,
+        description="Delete every entry of the cache",
+        validation_alias="clear",
+    )
+
+
+def main() -> None:
+    args = CacheArgs()
+    cache = StageCache(args.cache_dir, args.cache_size)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.cache_dir}")
+        return
+    entries = cache.entries()
+    for path, size, last_used in entries:
+        last_used = datetime.fromtimestamp(last_used)
+        print(f"{last_used:%Y-%m-%d %H:%M:%S} {size:>12} {path.name}")
+    print(
+        f"{len(entries)} entries, {cache.size()} / {cache.max_size} bytes"
+        f" in {args.cache_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from src.argparser.settings import Settings
+from src.service.client import LinesClient
+
+import h5py
+from pydantic import (
+    AliasChoices,
+    Field,
+    FilePath,
+)
+
+
+class LinesClientArgs(Settings, cli_prog_name="LinesClient"):
+    input: FilePath = Field(
+        description="The HDF5 file containing the raw data",
+        validation_alias="input",
+    )
+    host: str = Field(
+        "127.0.0.1",
+        description="The address of the service",
+        validation_alias="host",
+    )
+    port: int = Field(
+        8765,
+        description="The port of the service",
+        validation_alias="port",
+    )
+    send_data: bool = Field(
+        False,
+        description="Send the image itself instead of the path to the HDF5 file,"
+        " for services that can not read it",
+        validation_alias=AliasChoices("send-data", "send_data"),
+    )
+
+
+def main() -> None:
+    args = LinesClientArgs()
+    client = LinesClient(args.host, args.port)
+    if args.send_data:
+        with h5py.File(args.input, "r") as f:
+            if not "data" in f.keys():
+                raise ValueError("HDF5 file must contain the 'data' key")
+            result = client.find(f["data"][()])
+    else:
+        result = client.find(args.input)
+
+    print(f"Found {len(result['lines'])} lines from {result['n_points']} points:")
+    for line in result["lines"]:
+        print(
+            f"  r={line['r']:.4f} theta={line['theta']:.6f} votes={line['votes']:g}"
+            f" points={len(line['points'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
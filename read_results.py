@@ -0,0 +1,43 @@
+from src.argparser.settings import Settings
+from src.results import ResultsStore
+
+from pydantic import (
+    AliasChoices,
+    Field,
+    FilePath,
+)
+
+
+class ResultsArgs(Settings, cli_prog_name="Results"):
+    results: FilePath = Field(
+        description="The HDF5 results store to read",
+        validation_alias="results",
+    )
+    source: str | None = Field(
+        None,
+        description="Only show the lines found in this source",
+        validation_alias="source",
+    )
+    parameters: str | None = Field(
+        None,
+        description="Only show the lines found with this parameters hash",
+        validation_alias="parameters",
+    )
+    min_votes: float | None = Field(
+        None,
+        description="Only show the lines with at least this many votes",
+        validation_alias=AliasChoices("min-votes", "min_votes"),
+    )
+
+
+def main() -> None:
+    args = ResultsArgs()
+    store = ResultsStore(args.results)
+    table = store.read(
+        source=args.source, parameters=args.parameters, min_votes=args.min_votes
+    )
+    print(table.to_string())
+
+
+if __name__ == "__main__":
+    main()
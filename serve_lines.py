@@ -0,0 +1,72 @@
+from src.argparser.settings import Settings
+from src.service import LinesService
+
+from pydantic import (
+    AliasChoices,
+    Field,
+    PositiveInt,
+)
+
+from src.objects import Precision, RThetaBins, Spreads, Thresholds
+
+
+class LinesServiceArgs(Settings, cli_prog_name="LinesService"):
+    bins: RThetaBins = Field(
+        RThetaBins(r=500, theta=500),
+        validation_alias="bins",
+    )
+    line_width: float = Field(
+        1.0,
+        description="Width of the line: points along a found line are considered"
+        " 'on the line' if they are within this distance of the line",
+        validation_alias=AliasChoices("line-width", "line_width"),
+    )
+    spreads: Spreads = Field(
+        Spreads(xy=5, rtheta=15),
+        validation_alias="spreads",
+    )
+    thresholds: Thresholds = Field(
+        Thresholds(xy=1.0, rtheta=5.0),
+        validation_alias="thresholds",
+    )
+    precision: Precision = Field(
+        Precision.DOUBLE,
+        description="Numeric precision of the pipeline",
+        validation_alias="precision",
+    )
+    host: str = Field(
+        "127.0.0.1",
+        description="The address to listen on",
+        validation_alias="host",
+    )
+    port: int = Field(
+        8765,
+        description="The port to listen on",
+        validation_alias="port",
+    )
+    workers: PositiveInt | None = Field(
+        None,
+        description="Number of worker processes. Defaults to the number of CPUs",
+        validation_alias="workers",
+    )
+
+
+def main() -> None:
+    args = LinesServiceArgs()
+    print("Using args", args)
+
+    service = LinesService(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        thresholds=args.thresholds,
+        bins=args.bins,
+        line_width=args.line_width,
+        spreads=args.spreads,
+        precision=args.precision,
+    )
+    service.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
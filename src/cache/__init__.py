@@ -0,0 +1,3 @@
+from .stagecache import StageCache
+
+__all__ = ["StageCache"]
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pydantic_core
+from pydantic import BaseModel, PositiveInt, validate_call
+
+
+class StageCache:
+    """On-disk cache of the intermediate stages of the line finding.
+
+    Each entry is one HDF5 file named after its stage and a content hash of
+    everything the stage depends on. The total size of the directory is kept
+    below `max_size` bytes by evicting the least recently used entries."""
+
+    SUFFIX = ".hdf5"
+
+    @validate_call
+    def __init__(self, directory: Path, max_size: PositiveInt):
+        self.directory = directory
+        self.max_size = max_size
+        if self.directory.is_file():
+            raise ValueError("Cache directory must be a directory, not a file")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _, __):
+        return pydantic_core.core_schema.is_instance_schema(cls)
+
+    @staticmethod
+    def key(*parts: np.ndarray | BaseModel | str | float | int | None) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            if isinstance(part, np.ndarray):
+                digest.update(str((part.shape, part.dtype.str)).encode())
+                digest.update(np.ascontiguousarray(part).data)
+            elif isinstance(part, BaseModel):
+                digest.update(part.model_dump_json().encode())
+            else:
+                digest.update(repr(part).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.directory / f"{stage}_{key}{self.SUFFIX}"
+
+    def load(self, stage: str, key: str) -> dict[str, np.ndarray] | None:
+        path = self._path(stage, key)
+        # Another process sharing the cache may evict the entry at any time,
+        # which is a miss
+        try:
+            with h5py.File(path, "r") as f:
+                arrays = {name: f[name][()] for name in f.keys()}
+            # The modification time is used as the last access time for the LRU
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return arrays
+
+    def store(self, stage: str, key: str, **arrays: np.ndarray) -> None:
+        path = self._path(stage, key)
+        # A temporary file per writer, as several processes may store the same
+        # entry at once
+        fd, tmp_name = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            with h5py.File(tmp_path, "w") as f:
+                for name, array in arrays.items():
+                    f[name] = array
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._evict()
+
+    def entries(self) -> list[tuple[Path, int, float]]:
+        """The cached files with their size and last access time, least
+        recently used first."""
+        entries = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Evicted by another process since the glob
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def clear(self) -> None:
+        for path, _, _ in self.entries():
+            path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -9,15 +9,14 @@ from pydantic import BaseModel, validate_call
 
 from ..plotter.plotter import Plotter
 from ..functions import x, y, r
-from ..objects import Deviations, Points, Line, XYBins
+from ..objects import Deviations, Points, LineSet, XYBins
 from ..types import (
     IMAGE,
     POINTS,
     COORDINATES,
     SIGNAL,
-    POINT,
-    POINTS_AND_SIGNAL,
-    R_THETA,
+    R,
+    THETA,
 )
 
 
@@ -33,61 +32,39 @@ class PointsSpreadGenerator(Points):
         self.deviations = deviations
         self.max_points = points
         self.points: POINTS
-        self.signal: SIGNAL
-        # Do not use super() here as GeneratedLine derives on this class and on
-        # Line, and super() can then get confuse
-        Points.__init__(self, *self._generate_signal_and_bin())
+        super().__init__(*self._generate_signal_and_bin())
 
+    @staticmethod
     @validate_call
-    def _spread_one_point(self, x_y: POINT) -> POINTS_AND_SIGNAL:
-        s = self.deviations.spread
-        xmax, ymax = self.bins
-        xs, ys = np.mgrid[
-            max(x_y[0] - 3 * s, 0) : min(x_y[0] + 3 * s, xmax - 1) : 10j,
-            max(x_y[1] - 3 * s, 0) : min(x_y[1] + 3 * s, ymax - 1) : 10j,
-        ]
-        xs_ys = np.vstack((xs.flatten(), ys.flatten())).T
-        spread = stats.multivariate_normal.pdf(
-            xs_ys,
-            mean=x_y,
-            cov=[s] * 2,
+    def spread(
+        points: POINTS, bins: tuple[int, int], deviations: Deviations
+    ) -> tuple[POINTS, SIGNAL]:
+        """Spreads the signal of each point over a 10x10 grid around it,
+        following a Gaussian of variance deviations.spread, the signal of a
+        point being drawn from a Gaussian of mean 1. The grids of all the
+        points are computed at once, point after point."""
+        if deviations.spread == 0:
+            return points, np.random.normal(1, deviations.signal, points.shape[0])
+        s = deviations.spread
+        low = np.maximum(points - 3 * s, 0)
+        high = np.minimum(points + 3 * s, np.subtract(bins, 1))
+        # The edges included, as np.mgrid[low:high:10j]
+        grid = low[:, None] + (high - low)[:, None] * np.linspace(0, 1, 10)[:, None]
+        xs = np.repeat(grid[:, :, 0], 10, axis=1)
+        ys = np.tile(grid[:, :, 1], (1, 10))
+        spread = np.exp(
+            -((xs - points[:, :1]) ** 2 + (ys - points[:, 1:]) ** 2) / (2 * s)
         )
-        spread = np.random.normal(1, self.deviations.signal) * spread / spread.sum()
-        return np.concatenate([xs_ys, spread.reshape(-1, 1)], 1)
+        signal = np.random.normal(1, deviations.signal, (points.shape[0], 1))
+        spread *= signal / spread.sum(axis=1, keepdims=True)
+        return np.stack([xs, ys], axis=-1).reshape(-1, 2), spread.reshape(-1)
 
     def _generate_signal_and_bin(self) -> tuple[COORDINATES, SIGNAL]:
         if self.max_points.size == 0:
-            return np.zeros(shape=(0, 2), dtype=int), np.array([], dtype=float)
-        if self.deviations.spread > 0:
-            points = np.apply_along_axis(
-                self._spread_one_point,
-                1,
-                self.max_points,
-            ).reshape(-1, 3)
-            self.points = points[:, :2]
-            signal = points[:, -1]
-        else:
             self.points = self.max_points
-            signal = np.random.normal(1, self.stddev, size=self.points.shape[0])
-
-        xs, ys = self.points.T.astype(int)
-        xs = xs.reshape(-1, 1)
-        ys = ys.reshape(-1, 1)
-        return np.concatenate([xs, ys], 1), signal
-
-
-class GeneratedLine(PointsSpreadGenerator, Line):
-    @validate_call
-    def __init__(
-        self,
-        r: float,
-        theta: float,
-        points: POINTS,
-        bins: tuple[int, int],
-        deviations: Deviations,
-    ):
-        Line.__init__(self, r, theta, None, None)
-        PointsSpreadGenerator.__init__(self, points, bins, deviations)
+            return np.zeros(shape=(0, 2), dtype=int), np.array([], dtype=float)
+        self.points, signal = self.spread(self.max_points, self.bins, self.deviations)
+        return self.points.astype(int), signal
 
 
 class LineGenerator:
@@ -104,66 +81,65 @@ class LineGenerator:
         self.length = length
         self.deviations = deviations
 
+    @staticmethod
+    def _truncnorm(low, high, loc, scale: float, shape: tuple[int, int]):
+        """Gaussian draws around loc truncated to [low, high], loc if scale
+        is 0"""
+        if scale == 0:
+            return np.broadcast_to(loc, shape).astype(float)
+        return stats.truncnorm(
+            (low - loc) / scale, (high - loc) / scale, loc=loc, scale=scale
+        ).rvs(shape)
+
     @validate_call
-    def _point_on_line(self, r_theta: R_THETA) -> tuple[float, float]:
-        r_, theta_ = r_theta
-        y_range = y(np.array([0, self.bins.x], dtype=float), r_, theta_)
-        y_range.sort()
-        y_ = np.random.uniform(
-            max(0, y_range[0]),
-            min(y_range[1], self.bins.y),
+    def _points_on_lines(self, rs: R, thetas: THETA) -> POINTS:
+        """A point drawn uniformly in y on each line (rs[i], thetas[i]),
+        within the image"""
+        y_range = np.sort(
+            [
+                y(np.zeros_like(rs), rs, thetas),
+                y(np.full_like(rs, self.bins.x), rs, thetas),
+            ],
+            axis=0,
+        )
+        ys = np.random.uniform(
+            np.maximum(0, y_range[0]),
+            np.minimum(y_range[1], self.bins.y),
         )
-        return x(y_, r_, theta_), y_
+        return np.stack([x(ys, rs, thetas), ys], axis=1)
 
-    def _generate_line(self) -> GeneratedLine:
-        shape = (self.length, 1)
-        theta_ = np.random.uniform(
-            low=self.THETA_RANGE[0],
-            high=self.THETA_RANGE[1],
+    @validate_call
+    def generate(self, n: int) -> tuple[LineSet, POINTS, SIGNAL]:
+        """n lines at once: their (r, theta), each with self.length points
+        drawn around it in r and theta, as a LineSet, then the points spread
+        around these points and their signal, line after line"""
+        shape = (n, self.length)
+        theta_ = np.random.uniform(*self.THETA_RANGE, size=(n, 1))
+        thetas = self._truncnorm(
+            *self.THETA_RANGE, theta_, self.deviations.theta, shape
         )
-        thetas = (
-            stats.truncnorm(
-                (self.THETA_RANGE[0] - theta_) / self.deviations.theta,
-                (self.THETA_RANGE[1] - theta_) / self.deviations.theta,
-                loc=theta_,
-                scale=self.deviations.theta,
-            ).rvs(shape)
-            if self.deviations.theta > 0
-            else np.ones(shape) * theta_
+        corners = r(
+            np.repeat(theta_.reshape(-1), 4),
+            xs=np.tile(np.array([0, self.bins.x, 0, self.bins.x], dtype=float), n),
+            ys=np.tile(np.array([0, self.bins.y, self.bins.y, 0], dtype=float), n),
+        ).reshape(n, 4)
+        r_low = np.maximum(0, corners.min(axis=1, keepdims=True))
+        r_high = np.minimum(
+            min(self.bins.x, self.bins.y), corners.max(axis=1, keepdims=True)
         )
-        r_range = r(
-            theta_,
-            xs=np.array([0, self.bins.x, 0, self.bins.x], dtype=float),
-            ys=np.array([0, self.bins.y, self.bins.y, 0], dtype=float),
+        r_ = np.random.uniform(r_low, r_high)
+        rs = self._truncnorm(r_low, r_high, r_, self.deviations.r, shape)
+        points = self._points_on_lines(rs.reshape(-1), thetas.reshape(-1))
+        lines = LineSet(
+            r_.reshape(-1),
+            theta_.reshape(-1),
+            points=points,
+            offsets=np.arange(n + 1) * self.length,
         )
-        r_range = [
-            max(0, r_range.min()),
-            min(min((self.bins.x, self.bins.y)), r_range.max()),
-        ]
-        r_ = np.random.uniform(low=r_range[0], high=r_range[1])
-        rs = (
-            stats.truncnorm(
-                (r_range[0] - r_) / self.deviations.r,
-                (r_range[1] - r_) / self.deviations.r,
-                loc=r_,
-                scale=self.deviations.r,
-            ).rvs(shape)
-            if self.deviations.r > 0
-            else np.ones(shape) * r_
+        spread, signal = PointsSpreadGenerator.spread(
+            points, (self.bins.x, self.bins.y), self.deviations
         )
-        return GeneratedLine(
-            r_,
-            theta_,
-            np.apply_along_axis(
-                self._point_on_line, 1, np.concatenate([rs, thetas], 1)
-            ),
-            (self.bins.x, self.bins.y),
-            self.deviations,
-        )
-
-    @validate_call
-    def generate(self, n: int) -> tuple[GeneratedLine]:
-        return tuple(self._generate_line() for _ in range(n))
+        return lines, spread, signal
 
 
 class DataGenerator:
@@ -171,7 +147,7 @@ class DataGenerator:
     def __init__(self, config: BaseModel):
         self.config = config
 
-    def _create_image(self) -> tuple[IMAGE, tuple[GeneratedLine], COORDINATES]:
+    def _create_image(self) -> tuple[IMAGE, LineSet, COORDINATES]:
         image = (
             np.random.normal(
                 0,
@@ -181,39 +157,19 @@ class DataGenerator:
             if self.config.background_level > 0
             else np.zeros((self.config.bins.y, self.config.bins.x))
         )
-        noise, lines = self._create_points()
+        noise, (lines, lines_points, lines_signal) = self._create_points()
         binned_coordinates = np.concatenate(
-            [
-                noise.binned_coordinates,
-                *(line.binned_coordinates for line in lines),
-            ]
+            [noise.binned_coordinates, lines_points.astype(int)]
         )
-        max_coorindates = np.concatenate(
-            [
-                noise.max_points,
-                *(line.max_points for line in lines),
-            ]
-        ).astype(int)
-        signal = np.concatenate([noise.signal, *(line.signal for line in lines)])
+        max_coorindates = np.concatenate([noise.max_points, lines.points]).astype(int)
+        signal = np.concatenate([noise.signal, lines_signal])
         if (
             binned_coordinates[:, 0].max() >= image.shape[0]
             or binned_coordinates[:, 1].max() >= image.shape[1]
         ):
-            self._dumps(binned_coordinates, noise, lines, image)
-
-        uniques = np.unique(binned_coordinates, axis=0)
+            self._dumps(binned_coordinates, noise, lines, lines_points, image)
 
-        def sum_signal(bins):
-            x_coo, y_coo = bins
-            mask = np.where(
-                (binned_coordinates[:, 0] == x_coo)
-                & (binned_coordinates[:, 1] == y_coo)
-            )
-            return signal[mask].sum()
-
-        image[uniques[:, 0], uniques[:, 1]] += np.apply_along_axis(
-            sum_signal, 1, uniques
-        )
+        np.add.at(image, (binned_coordinates[:, 0], binned_coordinates[:, 1]), signal)
         return image, lines, max_coorindates
 
     @validate_call
@@ -221,7 +177,8 @@ class DataGenerator:
         self,
         binned_coordinates: COORDINATES,
         noise: PointsSpreadGenerator,
-        lines: tuple[GeneratedLine, ...],
+        lines: LineSet,
+        lines_points: POINTS,
         image: IMAGE,
     ):
         dumpdir = Path("dumped_data")
@@ -232,14 +189,15 @@ class DataGenerator:
         dumpdir.mkdir(parents=True)
 
         np.savetxt(dumpdir / "coordinates.csv", binned_coordinates, delimiter=",")
-        if noise.points:
+        if noise.points.size:
             np.savetxt(dumpdir / f"points_noise.csv", noise.points, delimiter=",")
-        for i, line in enumerate(lines):
-            np.savetxt(dumpdir / f"points_line_{i}.csv", line.points, delimiter=",")
-        points = np.concatenate([noise.points, *(line.points for line in lines)])
+        # Each line has as many spread points
+        for i, line_points in enumerate(np.array_split(lines_points, len(lines))):
+            np.savetxt(dumpdir / f"points_line_{i}.csv", line_points, delimiter=",")
+        points = np.concatenate([noise.points, lines_points])
         np.savetxt(
             dumpdir / "r_theta.csv",
-            np.array([[line.r, line.theta] for line in lines]),
+            np.stack([lines.rs, lines.thetas], axis=1),
             delimiter=",",
         )
 
@@ -294,7 +252,7 @@ class DataGenerator:
 
     def _create_points(
         self,
-    ) -> tuple[PointsSpreadGenerator, tuple[GeneratedLine]]:
+    ) -> tuple[PointsSpreadGenerator, tuple[LineSet, POINTS, SIGNAL]]:
         noise = self._create_noise_points_coordinates()
         line_generator = LineGenerator(
             self.config.bins,
@@ -304,13 +262,12 @@ class DataGenerator:
         lines = line_generator.generate(self.config.n_lines)
         return noise, lines
 
-    def generate(self) -> tuple[IMAGE, tuple[GeneratedLine]]:
+    def generate(self) -> tuple[IMAGE, LineSet]:
         image, lines, coordinates = self._create_image()
-        rs_thetas = [(line.r, line.theta) for line in lines]
         with h5py.File(self.config.output, "w") as ofile:
             ofile["data"] = image
-            ofile["lines"] = rs_thetas
+            ofile["lines"] = lines.found[:, :2]
 
-        plotter = Plotter(image, lines, coordinates)
+        plotter = Plotter(image, lines, coordinates, show_line_points=True)
         plotter.plot(self.config.output.with_suffix(".pdf"))
         return image, lines
@@ -0,0 +1,157 @@
+import math
+import time
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pandas as pd
+from pydantic import validate_call
+from scipy.optimize import linear_sum_assignment
+
+from ..linefinder import LinesFinder
+from ..objects import FinderConfiguration, Tolerances
+from ..types import POINTS
+
+
+class Evaluator:
+    """Runs LinesFinder configurations over generated data and compares the
+    found lines with the true ones stored in the 'lines' dataset by
+    DataGenerator, to weigh the accuracy of each configuration against its
+    speed."""
+
+    UNMATCHED = 1e9
+
+    @validate_call
+    def __init__(
+        self,
+        inputs: list[Path],
+        configurations: list[FinderConfiguration],
+        tolerances: Tolerances,
+    ):
+        self.inputs = inputs
+        self.configurations = configurations
+        self.tolerances = tolerances
+
+    def _differences(
+        self,
+        found_r: np.ndarray,
+        found_theta: np.ndarray,
+        true_r: np.ndarray,
+        true_theta: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Absolute r and theta differences between found and true lines, and
+        the cost of matching them. (r, theta) and (-r, theta -+ pi) being the
+        same line, the representation with the lowest cost is used."""
+        scale = np.maximum(
+            [self.tolerances.r, self.tolerances.theta], np.finfo(float).eps
+        )
+        d_r = np.abs(found_r - true_r)
+        d_theta = np.abs(found_theta - true_theta)
+        flipped_d_r = np.abs(found_r + true_r)
+        flipped_d_theta = np.abs(d_theta - math.pi)
+
+        def cost(d_r, d_theta):
+            d_r, d_theta = d_r / scale[0], d_theta / scale[1]
+            return d_r + d_theta + self.UNMATCHED * ((d_r > 1) | (d_theta > 1))
+
+        direct_cost = cost(d_r, d_theta)
+        flipped_cost = cost(flipped_d_r, flipped_d_theta)
+        flipped = flipped_cost < direct_cost
+        return (
+            np.where(flipped, flipped_d_r, d_r),
+            np.where(flipped, flipped_d_theta, d_theta),
+            np.where(flipped, flipped_cost, direct_cost),
+        )
+
+    @validate_call
+    def match(self, found: POINTS, true: POINTS) -> tuple[np.ndarray, np.ndarray]:
+        """Indices of the found and true (r, theta) lines matched one to one,
+        minimising the sum of the differences in units of the tolerances.
+        Lines are only matched within the tolerances."""
+        _, _, cost = self._differences(
+            found[:, :1], found[:, 1:], true[:, 0], true[:, 1]
+        )
+        found_indices, true_indices = linear_sum_assignment(cost)
+        matched = cost[found_indices, true_indices] < self.UNMATCHED
+        return found_indices[matched], true_indices[matched]
+
+    def _evaluate_one(self, finder: LinesFinder, path: Path) -> dict:
+        with h5py.File(path, "r") as f:
+            if not "lines" in f.keys():
+                raise ValueError("HDF5 file must contain the 'lines' key")
+            true = np.asarray(f["lines"][()], dtype=float).reshape(-1, 2)
+        start = time.perf_counter()
+        result = finder.with_data(path).compute()
+        found = result[-1].found[:, :2] if result is not None else np.zeros((0, 2))
+        runtime = time.perf_counter() - start
+        n_found, n_true = found.shape[0], true.shape[0]
+
+        found_indices, true_indices = self.match(found, true)
+        found, true = found[found_indices], true[true_indices]
+        d_r, d_theta, _ = self._differences(
+            found[:, 0], found[:, 1], true[:, 0], true[:, 1]
+        )
+        return {
+            "n_found": n_found,
+            "n_true": n_true,
+            "n_matched": found_indices.size,
+            "sum_r_error": d_r.sum(),
+            "sum_theta_error": d_theta.sum(),
+            "runtime": runtime,
+        }
+
+    def evaluate(self) -> pd.DataFrame:
+        """One row per configuration, with its precision, recall, mean errors
+        on the matched lines and mean runtime per image. The 'pareto' column
+        flags the configurations that no other is both faster and more
+        accurate (F1 score) than."""
+        rows = []
+        for configuration in self.configurations:
+            finder = LinesFinder(
+                data=None,
+                output=Path("."),
+                **configuration.model_dump(exclude={"name"}),
+            )
+            results = pd.DataFrame(
+                [self._evaluate_one(finder, path) for path in self.inputs]
+            )
+            totals = results.sum()
+            precision = totals.n_matched / totals.n_found if totals.n_found else 0.0
+            recall = totals.n_matched / totals.n_true if totals.n_true else 0.0
+            rows.append(
+                {
+                    "name": configuration.name,
+                    "precision": precision,
+                    "recall": recall,
+                    "f1": (
+                        2 * precision * recall / (precision + recall)
+                        if precision + recall
+                        else 0.0
+                    ),
+                    "mean_r_error": (
+                        totals.sum_r_error / totals.n_matched
+                        if totals.n_matched
+                        else np.nan
+                    ),
+                    "mean_theta_error": (
+                        totals.sum_theta_error / totals.n_matched
+                        if totals.n_matched
+                        else np.nan
+                    ),
+                    "runtime": results.runtime.mean(),
+                }
+            )
+        table = pd.DataFrame(rows)
+        table["pareto"] = self.pareto(table.runtime.to_numpy(), table.f1.to_numpy())
+        return table
+
+    @staticmethod
+    def pareto(runtime: np.ndarray, f1: np.ndarray) -> np.ndarray:
+        """Whether each configuration is not dominated, no other being at least
+        as fast and as accurate and strictly better on one of the two"""
+        dominated = (
+            (runtime[:, None] >= runtime)
+            & (f1[:, None] <= f1)
+            & ((runtime[:, None] > runtime) | (f1[:, None] < f1))
+        ).any(axis=1)
+        return ~dominated
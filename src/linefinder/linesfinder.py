@@ -1,16 +1,28 @@
 import math
+from copy import copy
+from functools import cached_property
 from pathlib import Path
-from functools import partial
 import numpy as np
 import h5py
-import matplotlib.pyplot as plt
+import pydantic_core
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from pydantic import validate_call
 
-from ..types import IMAGE, POINTS, R
+from ..cache import StageCache
+from ..results import ResultsStore
+from ..types import ACCUMULATOR, IMAGE, POINTS, R, SIGNAL
 from .pointsfinder import PointsFinder
-from ..functions import r
 from ..plotter import Plotter
-from ..objects import Line, RThetaBins, Spreads, Thresholds
+from ..objects import (
+    Hits,
+    LineSet,
+    Precision,
+    RBinning,
+    RThetaBins,
+    Spreads,
+    Thresholds,
+)
 
 
 class LinesFinder:
@@ -19,84 +31,338 @@ class LinesFinder:
     @validate_call
     def __init__(
         self,
-        data: IMAGE | Path,
+        data: IMAGE | Hits | Path | None,
         thresholds: Thresholds,
         output: Path,
         bins: RThetaBins,
         line_width: float,
         spreads: Spreads,
+        precision: Precision = Precision.DOUBLE,
+        cache: StageCache | None = None,
+        results: ResultsStore | None = None,
+        r_binning: RBinning = RBinning.POINTS,
+        r_range: tuple[float, float] | None = None,
+        plot: bool = True,
     ):
+        if r_binning is RBinning.FIXED and r_range is None:
+            raise ValueError("A fixed r binning needs an r range")
+        if r_binning is not RBinning.FIXED and r_range is not None:
+            raise ValueError("An r range can only be given to a fixed r binning")
+        if r_range is not None and r_range[0] >= r_range[1]:
+            raise ValueError("The r range must be increasing")
         self.output = output
+        self.cache = cache
+        self.results = results
+        self.plot = plot
         self.bins = bins
         self.line_width = line_width
         self.thresholds = thresholds
         self.spreads = spreads
+        self.precision = precision
+        self.r_binning = r_binning
+        self.r_range = r_range
+        dtype = self.precision.float_dtype
         self.thetas = np.linspace(
-            self.THETA_RANGE[0], self.THETA_RANGE[1], self.bins.theta
+            self.THETA_RANGE[0], self.THETA_RANGE[1], self.bins.theta, dtype=dtype
         ).reshape(-1, 1)
-        if isinstance(data, np.ndarray):
-            self.data = data
-        else:
+        self.cos_thetas = np.cos(self.thetas[:, 0])
+        self.sin_thetas = np.sin(self.thetas[:, 0])
+        # Without data, the finder only holds the configuration and the trig
+        # tables, and is meant to be fed with with_data()
+        self.source = None
+        self.data = None
+        self.hits = None
+        self.pointsfinder = None
+        if data is not None:
+            self._load(data)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _, __):
+        return pydantic_core.core_schema.is_instance_schema(cls)
+
+    @validate_call
+    def _load(self, data: IMAGE | Hits | Path):
+        """Loads either a dense image, or sparse hits that skip the point
+        finding and go straight to the accumulator. HDF5 files hold the image
+        in 'data' or the hits in 'hits', as (x, y) or (x, y, signal) rows."""
+        if isinstance(data, Path):
+            self.source = str(data)
             if not data.suffix == ".hdf5":
                 raise ValueError("Can only read HDF5 files")
             with h5py.File(data, "r") as f:
-                if not "data" in f.keys():
-                    raise ValueError("HDF5 file must contain the 'data' key")
-                self._set_data(f["data"][()])
+                if "hits" in f.keys():
+                    hits = f["hits"][()]
+                    shape = f["hits"].attrs.get("shape")
+                    data = Hits(
+                        hits[:, :2],
+                        hits[:, 2] if hits.shape[1] > 2 else None,
+                        tuple(shape) if shape is not None else None,
+                    )
+                elif "data" in f.keys():
+                    data = f["data"][()]
+                else:
+                    raise ValueError(
+                        "HDF5 file must contain the 'data' or 'hits' key"
+                    )
+        else:
+            self.source = "array"
+
+        if isinstance(data, Hits):
+            self._set_hits(data)
+            self.xy_bins: tuple[int, int] = self.hits.shape
+            return
+        self._set_data(data)
         self.xy_bins: tuple[int, int] = self.data.shape
-        self.pointsfinder = PointsFinder(self.data, thresholds.xy, spreads.xy)
+        self.pointsfinder = PointsFinder(
+            self.data, self.thresholds.xy, self.spreads.xy, self.precision
+        )
+
+    def without_data(self) -> "LinesFinder":
+        """A finder with the same configuration and trig tables as this one,
+        but no data, cheap to send to other processes."""
+        finder = copy(self)
+        finder.__dict__.pop("_data_key", None)
+        finder.source = None
+        finder.data = None
+        finder.hits = None
+        finder.pointsfinder = None
+        return finder
+
+    def with_data(self, data: IMAGE | Hits | Path) -> "LinesFinder":
+        """A finder with the same configuration and trig tables as this one,
+        working on other data."""
+        finder = self.without_data()
+        finder._load(data)
+        return finder
 
     @validate_call
     def _set_data(self, data: IMAGE):
-        self.data = data
+        self.data = data.astype(self.precision.float_dtype, copy=False)
+
+    @validate_call
+    def _set_hits(self, hits: Hits):
+        dtype = self.precision.float_dtype
+        signal = hits.signal
+        self.hits = Hits(
+            hits.points.astype(dtype, copy=False),
+            signal.astype(dtype, copy=False) if signal is not None else None,
+            hits.shape,
+        )
+
+    def _r_limits(self, rs: np.ndarray) -> tuple[float, float]:
+        if self.r_binning is RBinning.POINTS:
+            return float(rs.min()), float(rs.max())
+        if self.r_binning is RBinning.IMAGE:
+            diagonal = math.hypot(*self.xy_bins)
+            return -diagonal, diagonal
+        return self.r_range
 
     @validate_call
-    def _create_accumulator(self, points: POINTS) -> tuple[IMAGE, R]:
-        rs = np.apply_along_axis(
-            partial(r, xs=points[:, 0], ys=points[:, 1]), 1, self.thetas
-        ).T
-        r_range = (rs.min().min(), rs.max().max())
-        r_bins = np.linspace(r_range[0], r_range[1], self.bins.r)
-        binned_rs = np.digitize(rs, r_bins) - 1
-        binned_thetas = np.digitize(self.thetas[:, 0], self.thetas[:, 0]) - 1
-        image = np.zeros((self.bins.r, self.bins.theta))
-        rs_thetas = np.concatenate(
-            [
-                binned_rs.reshape(binned_rs.shape[0] * binned_rs.shape[1], 1),
-                np.concatenate([binned_thetas] * binned_rs.shape[0]).reshape(-1, 1),
-            ],
-            1,
+    def _create_accumulator(
+        self, points: POINTS, weights: SIGNAL | None = None
+    ) -> tuple[ACCUMULATOR, R]:
+        # One row per point, one column per theta
+        rs = np.outer(points[:, 0], self.cos_thetas) + np.outer(
+            points[:, 1], self.sin_thetas
+        )
+        r_min, r_max = self._r_limits(rs)
+        dtype = self.precision.float_dtype
+        r_bins = np.linspace(r_min, r_max, self.bins.r, dtype=dtype)
+        # The bins being evenly spaced, the bin of each r is found arithmetically,
+        # then moved by one where rounding put it next to the one np.digitize
+        # gives
+        step = (r_max - r_min) / max(self.bins.r - 1, 1) if r_max > r_min else 1.0
+        binned_rs = np.clip(
+            np.floor((rs - r_min) / step).astype(np.int64), 0, self.bins.r - 1
         )
-        uniques = np.unique(rs_thetas, axis=0, return_counts=True)
-        image[uniques[0][:, 0], uniques[0][:, 1]] = uniques[1]
+        binned_rs -= rs < r_bins[binned_rs]
+        upper = np.minimum(binned_rs + 1, self.bins.r - 1)
+        binned_rs += (binned_rs < self.bins.r - 1) & (rs >= r_bins[upper])
+        binned_thetas = np.arange(self.bins.theta)
+        # Only a fixed r range can leave r values out of it
+        in_range = (binned_rs >= 0) & (rs <= r_max)
+        if weights is not None:
+            weights = np.broadcast_to(weights.reshape(-1, 1), binned_rs.shape)[in_range]
+        votes = np.bincount(
+            (binned_rs * self.bins.theta + binned_thetas)[in_range],
+            weights=weights,
+            minlength=self.bins.r * self.bins.theta,
+        )
+        dtype = self.precision.accumulator_dtype(
+            points.shape[0],
+            weighted=weights is not None,
+            summable=self.r_binning is not RBinning.POINTS,
+        )
+        image = votes.reshape(self.bins.r, self.bins.theta).astype(dtype)
         return image, r_bins
 
-    def find(self):
+    @cached_property
+    def _data_key(self) -> str:
+        if self.hits is not None:
+            return StageCache.key(self.hits.points, self.hits.signal)
+        return StageCache.key(self.data)
+
+    def _points_key(self) -> str:
+        return StageCache.key(
+            self._data_key, self.thresholds.xy, self.spreads.xy, self.precision.value
+        )
+
+    def _accumulator_key(self, points: POINTS, weights: SIGNAL | None) -> str:
+        return StageCache.key(
+            points,
+            weights,
+            self.thetas,
+            self.bins,
+            self.r_binning.value,
+            self.r_range,
+            self.xy_bins,
+        )
+
+    def parameters_key(self) -> str:
+        """Hash of all the parameters the found lines depend on"""
+        return StageCache.key(
+            self.thresholds,
+            self.spreads,
+            self.bins,
+            self.line_width,
+            self.precision.value,
+            self.r_binning.value,
+            self.r_range,
+        )
+
+    def find_points(self) -> POINTS:
+        """Points above thresholds.xy in the x-y space. The result only depends
+        on the data, thresholds.xy, spreads.xy and precision. Sparse hits are
+        used as they are."""
+        if self.hits is not None:
+            return self.hits.points
+        if self.cache is None:
+            return self.pointsfinder.find()
+        key = self._points_key()
+        cached = self.cache.load("points", key)
+        if cached is not None:
+            return cached["points"]
         points = self.pointsfinder.find()
-        lines = []
-        if points.size == 0:
-            print("No points found")
-            return
-        accumulator, r_bins = self._create_accumulator(points)
+        self.cache.store("points", key, points=points)
+        return points
+
+    @validate_call
+    def accumulate(self, points: POINTS) -> tuple[ACCUMULATOR, R]:
+        """The r-theta accumulator of the points and its r bins. The result
+        only depends on the points, their weights and the binning. The votes
+        of sparse hits are weighted by their signal, if any."""
+        weights = self.hits.signal if self.hits is not None else None
+        if self.cache is None:
+            return self._create_accumulator(points, weights)
+        key = self._accumulator_key(points, weights)
+        cached = self.cache.load("accumulator", key)
+        if cached is not None:
+            return cached["accumulator"], cached["r_bins"]
+        accumulator, r_bins = self._create_accumulator(points, weights)
+        self.cache.store("accumulator", key, accumulator=accumulator, r_bins=r_bins)
+        return accumulator, r_bins
+
+    @validate_call
+    def find_lines(
+        self, points: POINTS, accumulator: ACCUMULATOR, r_bins: R
+    ) -> tuple[POINTS, LineSet]:
+        """Finds the peaks of the accumulator and assigns the points to the
+        corresponding lines. Returns the peaks as (r, theta) bin indices and
+        the lines."""
         pointsfinder = PointsFinder(
-            accumulator, self.thresholds.rtheta, self.spreads.rtheta
+            accumulator, self.thresholds.rtheta, self.spreads.rtheta, self.precision
         )
         rs_thetas = pointsfinder.find()
+        r_indices, theta_indices = rs_thetas.astype(int).T
+        lines = LineSet(
+            r_bins[r_indices].astype(float),
+            self.thetas[theta_indices, 0].astype(float),
+            accumulator[r_indices, theta_indices].astype(float),
+        )
+        lines.assign_points(points, self.line_width)
+        return rs_thetas, lines
+
+    def compute(self) -> tuple[POINTS, ACCUMULATOR, R, POINTS, LineSet] | None:
+        """Runs the whole line finding without writing anything. Returns the
+        points, the accumulator and its r bins, the peaks as (r, theta) bin
+        indices and the lines, or None if no point was found."""
+        points = self.find_points()
+        if points.size == 0:
+            return None
+        accumulator, r_bins = self.accumulate(points)
+        rs_thetas, lines = self.find_lines(points, accumulator, r_bins)
+        return points, accumulator, r_bins, rs_thetas, lines
+
+    def save(
+        self,
+        points: POINTS,
+        accumulator: ACCUMULATOR,
+        r_bins: R,
+        rs_thetas: POINTS,
+        lines: LineSet,
+    ):
+        """Reports, writes and plots the output of compute(). With a results
+        store, nothing is written in the output directory unless plotting."""
+        self._write(lines, rs_thetas, accumulator, r_bins)
+        if not self.plot:
+            return
+        self.output.mkdir(parents=True, exist_ok=True)
         plotter_r_theta = Plotter(accumulator, None, rs_thetas.astype(int))
         plotter_r_theta.plot(self.output / "found_rtheta.pdf")
-        for r_, theta_ in rs_thetas:
-            line = Line(r_bins[int(r_)], self.thetas[int(theta_)])
-            line.points_on_line(points, self.line_width, self.data)
-            lines.append(line)
+        # Sparse hits have no dense image to draw the lines on
+        if self.data is not None:
+            plotter = Plotter(self.data, lines, points.astype(int))
+            plotter.plot(self.output / "found_lines.pdf")
 
+    def find(self):
+        result = self.compute()
+        if result is None:
+            print("No points found")
+            return
+        self.save(*result)
+
+    def _write(
+        self,
+        lines: LineSet,
+        rs_thetas: POINTS | None = None,
+        accumulator: ACCUMULATOR | None = None,
+        r_bins: R | None = None,
+    ):
+        """Reports the lines and appends them to the results store, or writes
+        them to found_rtheta.hdf5 with the peaks and the accumulator, if any"""
+        self._report(lines)
+        if self.results is not None:
+            self.results.append(self.source, self.parameters_key(), lines)
+            return
+        self.output.mkdir(parents=True, exist_ok=True)
         with h5py.File(self.output / "found_rtheta.hdf5", "w") as ofile:
-            ofile["lines"] = rs_thetas
-        plotter = Plotter(self.data, lines, points.astype(int))
-        plotter.plot(self.output / "found_lines.pdf")
+            if rs_thetas is not None:
+                ofile["lines"] = rs_thetas
+            ofile["lines_rtheta"] = lines.found
+            lines.to_hdf5(ofile.create_group("found"))
+            ofile.attrs["precision"] = self.precision.value
+            ofile.attrs["r_binning"] = self.r_binning.value
+            if accumulator is None:
+                return
+            # With its binning, an accumulator can be added to the ones of
+            # other images binned the same way
+            dataset = ofile.create_dataset(
+                "accumulator", data=accumulator, compression="gzip"
+            )
+            dataset.attrs["r_binning"] = self.r_binning.value
+            dataset.attrs["r_range"] = (r_bins[0], r_bins[-1])
+            dataset.attrs["theta_range"] = self.THETA_RANGE
+
+    def _report(self, lines: LineSet):
+        print(f"Found {len(lines)} lines ({self.precision.value}):")
+        for r_, theta_, votes in lines.found:
+            print(f"  r={r_:.4f} theta={theta_:.6f} votes={votes:g}")
 
     @validate_call
     def _plot(self, data: IMAGE, r_bins: list[float]):
-        fig, ax = plt.subplots(figsize=(10, 10 * data.shape[1] / data.shape[0]))
+        fig = Figure(figsize=(10, 10 * data.shape[1] / data.shape[0]))
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
         image = ax.imshow(
             data.T,
             origin="lower",
@@ -105,8 +371,7 @@ class LinesFinder:
         r_step = self.bins.r / 5
         theta_step = self.bins.theta / 4
         fig.colorbar(image, ax=ax, shrink=0.8)
-        ax = plt.gca()
-        plt.xticks(
+        ax.set_xticks(
             np.arange(0, self.bins.r + 1, r_step),
             r_bins[:: int(r_step)] + [r_bins[-1]],
         )
@@ -117,8 +382,8 @@ class LinesFinder:
             "$\\frac{3\\pi}{4}$",
             "$\\pi$",
         ]
-        plt.yticks(np.arange(0, self.bins.theta + 1, theta_step), theta_labels)
-        plt.xlabel("$r$")
-        plt.ylabel("$\\theta$")
+        ax.set_yticks(np.arange(0, self.bins.theta + 1, theta_step), theta_labels)
+        ax.set_xlabel("$r$")
+        ax.set_ylabel("$\\theta$")
         fig.tight_layout()
-        plt.savefig(self.output / "r_theta.pdf")
+        fig.savefig(self.output / "r_theta.pdf")
@@ -2,34 +2,44 @@ import numpy as np
 import scipy.ndimage.filters as filters
 from pydantic import validate_call
 
-from ..types import COORDINATE, R_THETA, IMAGE, POINTS
+from ..objects import Precision
+from ..types import ACCUMULATOR, COORDINATE, R_THETA, IMAGE, POINTS
 
 
 class PointsFinder:
     @validate_call
-    def __init__(self, data: IMAGE, threshold: float, spread: int):
+    def __init__(
+        self,
+        data: IMAGE | ACCUMULATOR,
+        threshold: float,
+        spread: int,
+        precision: Precision = Precision.DOUBLE,
+    ):
         self.threshold = threshold
+        self.precision = precision
         self.data = data
         self.spread = spread
 
     @validate_call
-    def _set_data(self, data: IMAGE):
+    def _set_data(self, data: IMAGE | ACCUMULATOR):
         self.data = data
 
     def find(self) -> POINTS | R_THETA:
+        dtype = self.precision.float_dtype
+        data = self.data.astype(dtype, copy=False)
         size = self.spread * 2 + 1
-        kernel = -np.ones((size, size))
+        kernel = -np.ones((size, size), dtype=dtype)
         kernel[self.spread, self.spread] = size**2
-        convoluted = filters.convolve(self.data, kernel, mode="constant")
+        convoluted = filters.convolve(data, kernel, mode="constant")
         maxima = convoluted == filters.maximum_filter(convoluted, self.spread)
-        mask = (self.data > self.threshold) & maxima
+        mask = (data > self.threshold) & maxima
 
         xs, ys = np.where(mask)
         return (
             np.concatenate(
                 [np.array(xs).reshape(-1, 1), np.array(ys).reshape(-1, 1)], axis=1
-            )
-            + 0.5
+            ).astype(dtype)
+            + dtype(0.5)
         )  # +0.5 to center the bins
 
     @staticmethod
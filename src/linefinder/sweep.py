@@ -0,0 +1,183 @@
+import itertools
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from copy import copy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import PositiveInt, validate_call
+
+from ..objects import (
+    LineSet,
+    Precision,
+    RThetaBins,
+    Spreads,
+    SpreadsGrid,
+    Thresholds,
+    ThresholdsGrid,
+)
+from ..types import ACCUMULATOR, IMAGE, POINTS, R
+from .linesfinder import LinesFinder
+
+
+def _find_leaves(
+    template: LinesFinder,
+    node: dict,
+    leaves: list[tuple[float, int, float]],
+    points: POINTS,
+    accumulator: ACCUMULATOR,
+    r_bins: R,
+) -> list[dict]:
+    """The rows of a chunk of the leaves sharing one accumulator, found with
+    copies of a finder without data"""
+    rows = []
+    for threshold_rtheta, spread_rtheta, line_width in leaves:
+        finder = copy(template)
+        finder.thresholds = Thresholds(xy=node["threshold_xy"], rtheta=threshold_rtheta)
+        finder.spreads = Spreads(xy=node["spread_xy"], rtheta=spread_rtheta)
+        finder.line_width = line_width
+        _, lines = finder.find_lines(points, accumulator, r_bins)
+        leaf = {
+            **node,
+            "threshold_rtheta": threshold_rtheta,
+            "spread_rtheta": spread_rtheta,
+            "line_width": line_width,
+        }
+        rows.extend(Sweep.rows(leaf, points.shape[0], lines))
+    return rows
+
+
+class Sweep:
+    """Runs the line finding over a grid of parameters. The grid is walked as
+    a tree so that each stage only runs once per combination of the parameters
+    it depends on: point finding once per (thresholds.xy, spreads.xy), the
+    accumulator once per point set and bins, and the peak finding and line
+    assignment once per leaf. Leaves run in parallel, the leaves of one
+    accumulator being split in as many tasks as there are workers, so that the
+    accumulator is sent at most once per worker."""
+
+    @validate_call
+    def __init__(
+        self,
+        data: IMAGE,
+        output: Path,
+        bins: list[RThetaBins],
+        line_widths: list[float],
+        spreads: SpreadsGrid,
+        thresholds: ThresholdsGrid,
+        precision: Precision = Precision.DOUBLE,
+        workers: PositiveInt | None = None,
+    ):
+        self.data = data
+        self.output = output
+        self.bins = bins
+        self.line_widths = line_widths
+        self.spreads = spreads
+        self.thresholds = thresholds
+        self.precision = precision
+        self.workers = workers
+
+    def _finder(
+        self,
+        data: IMAGE | None,
+        bins: RThetaBins,
+        threshold_xy: float = 0.0,
+        spread_xy: int = 0,
+    ) -> LinesFinder:
+        # The r-theta parameters are set per leaf
+        return LinesFinder(
+            data=data,
+            thresholds=Thresholds(xy=threshold_xy, rtheta=0.0),
+            output=self.output.parent,
+            bins=bins,
+            line_width=0.0,
+            spreads=Spreads(xy=spread_xy, rtheta=0),
+            precision=self.precision,
+        )
+
+    @staticmethod
+    def rows(parameters: dict, n_points: int, lines: LineSet) -> list[dict]:
+        if not len(lines):
+            return [
+                {
+                    **parameters,
+                    "n_points": n_points,
+                    "n_lines": 0,
+                    "r": np.nan,
+                    "theta": np.nan,
+                    "votes": np.nan,
+                    "points_on_line": 0,
+                }
+            ]
+        return [
+            {
+                **parameters,
+                "n_points": n_points,
+                "n_lines": len(lines),
+                "r": r_,
+                "theta": theta_,
+                "votes": votes,
+                "points_on_line": n_points_on_line,
+            }
+            for r_, theta_, votes, n_points_on_line in zip(
+                lines.rs, lines.thetas, lines.votes, lines.n_points
+            )
+        ]
+
+    def run(self) -> pd.DataFrame:
+        leaves = list(
+            itertools.product(
+                self.thresholds.rtheta, self.spreads.rtheta, self.line_widths
+            )
+        )
+        # One finder without data per bins holds the trig tables, builds the
+        # accumulators and is sent to the workers
+        templates = [self._finder(None, bins) for bins in self.bins]
+        size = -(-len(leaves) // (self.workers or os.cpu_count() or 1))
+        chunks = [leaves[i : i + size] for i in range(0, len(leaves), size)]
+        rows: list[dict] = []
+        futures: list[Future] = []
+        with ProcessPoolExecutor(self.workers) as executor:
+            for threshold_xy, spread_xy in itertools.product(
+                self.thresholds.xy, self.spreads.xy
+            ):
+                points = self._finder(
+                    self.data, self.bins[0], threshold_xy, spread_xy
+                ).find_points()
+                for bins, template in zip(self.bins, templates):
+                    node = {
+                        "threshold_xy": threshold_xy,
+                        "spread_xy": spread_xy,
+                        "bins_r": bins.r,
+                        "bins_theta": bins.theta,
+                    }
+                    if points.size == 0:
+                        for threshold_rtheta, spread_rtheta, line_width in leaves:
+                            leaf = {
+                                **node,
+                                "threshold_rtheta": threshold_rtheta,
+                                "spread_rtheta": spread_rtheta,
+                                "line_width": line_width,
+                            }
+                            rows.extend(self.rows(leaf, 0, LineSet.empty()))
+                        continue
+                    accumulator, r_bins = template.accumulate(points)
+                    futures.extend(
+                        executor.submit(
+                            _find_leaves,
+                            template,
+                            node,
+                            chunk,
+                            points,
+                            accumulator,
+                            r_bins,
+                        )
+                        for chunk in chunks
+                    )
+            for future in futures:
+                rows.extend(future.result())
+
+        table = pd.DataFrame(rows)
+        table.to_csv(self.output, index=False)
+        return table
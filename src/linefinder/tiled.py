@@ -0,0 +1,173 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pydantic import NonNegativeInt, PositiveInt, validate_call
+
+from ..functions import r
+from ..objects import LineSet, Tolerances, XYBins
+from ..plotter import Plotter
+from ..types import IMAGE, POINT, POINTS
+from .linesfinder import LinesFinder
+
+
+def _find_tile(finder: LinesFinder, tile: IMAGE, origin: tuple[int, int]) -> LineSet:
+    """Lines found in one tile, in global coordinates"""
+    result = finder.with_data(tile).compute()
+    if result is None:
+        return LineSet.empty()
+    *_, lines = result
+    lines.rs = lines.rs + r(lines.thetas, xs=float(origin[0]), ys=float(origin[1]))
+    lines.points = lines.points + origin
+    return lines
+
+
+class TiledLinesFinder:
+    """Splits a wide image into overlapping tiles, each given to its own
+    local Hough transform in a process pool, so that the r range and the
+    accumulator stay the size of a tile. The local (r, theta) detections are
+    converted to global coordinates and the collinear ones, found in several
+    tiles, are merged."""
+
+    @validate_call
+    def __init__(
+        self,
+        finder: LinesFinder,
+        tile: XYBins,
+        overlap: NonNegativeInt,
+        merge: Tolerances,
+        workers: PositiveInt | None = None,
+    ):
+        if overlap >= min(tile.x, tile.y):
+            raise ValueError("The overlap must be smaller than the tiles")
+        if finder.data is None:
+            raise ValueError("The tiled finder only works on dense images")
+        self.finder = finder
+        self.template = finder.without_data()
+        self.tile = tile
+        self.overlap = overlap
+        self.merge = merge
+        self.workers = workers
+
+    @staticmethod
+    def _starts(size: int, tile: int, overlap: int) -> list[int]:
+        starts = list(range(0, max(size - tile, 0) + 1, tile - overlap))
+        if starts[-1] + tile < size:
+            starts.append(size - tile)
+        return starts
+
+    def _tiles(self):
+        nx, ny = self.finder.data.shape
+        for x0 in self._starts(nx, self.tile.x, self.overlap):
+            for y0 in self._starts(ny, self.tile.y, self.overlap):
+                tile = self.finder.data[x0 : x0 + self.tile.x, y0 : y0 + self.tile.y]
+                yield tile, (x0, y0)
+
+    def _inliers(
+        self, lines: LineSet, i: int, location: POINT, r_: float, theta: float
+    ) -> POINTS | None:
+        """The points of line i within the r tolerance of the line (r_, theta),
+        or None if line i does not lie along it, most of its points being
+        farther. Lines without points need their theta within the theta
+        tolerance, modulo pi, and the point of line i closest to the location
+        it was found at within the r resolution of a tile of the line."""
+        points = lines.points_of(i)
+        if points.shape[0] != 0:
+            distances = np.abs(r(float(theta), xs=points[:, 0], ys=points[:, 1]) - r_)
+            close = distances <= self.merge.r
+            return points[close] if np.mean(close) >= 0.5 else None
+        d_theta = abs(lines.thetas[i] - theta)
+        if min(d_theta, np.pi - d_theta) > self.merge.theta:
+            return None
+        normal = np.array([np.cos(lines.thetas[i]), np.sin(lines.thetas[i])])
+        point = location + (lines.rs[i] - normal @ location) * normal
+        distance = abs(r(float(theta), xs=point[0], ys=point[1]) - r_)
+        return points if distance <= max(self.merge.r, self._r_resolution) else None
+
+    @property
+    def _r_resolution(self) -> float:
+        """Upper bound of the width of the r bins of a tile, whose r values
+        span at most -diagonal to +diagonal"""
+        diagonal = math.hypot(self.tile.x, self.tile.y)
+        return 2 * diagonal / max(self.finder.bins.r - 1, 1)
+
+    @staticmethod
+    def _fit(points: np.ndarray) -> tuple[float, float]:
+        """(r, theta) of the total least squares line through the points, theta
+        in [0, pi)"""
+        centre = points.mean(axis=0)
+        normal = np.linalg.svd(points - centre)[2][-1]
+        theta = np.arctan2(normal[1], normal[0]) % np.pi
+        return float(r(theta, xs=centre[0], ys=centre[1])), float(theta)
+
+    @validate_call
+    def _merge(self, lines: LineSet, locations: POINTS) -> LineSet:
+        """Greedily merges the lines found along the same line in different
+        tiles, `locations` being the centres of the tiles they were found in.
+        A global r is off by the theta error of a tile times its distance to
+        the origin, so lines are compared by their points rather than their
+        (r, theta): a group grows with the lines collinear with it, its
+        (r, theta) being refitted on the points of the group each time it
+        grows. Groups start from the lines with the most points, which give
+        the best fits, then the most votes."""
+        order = np.lexsort((-lines.votes, -lines.n_points))
+        merged = np.zeros(len(lines), dtype=bool)
+        rs, thetas, votes, points = [], [], [], []
+        for seed in order:
+            if merged[seed]:
+                continue
+            merged[seed] = True
+            group = [seed]
+            group_r, group_theta = lines.rs[seed], lines.thetas[seed]
+            group_points = lines.points_of(seed)
+            grown = True
+            while grown:
+                if np.unique(group_points, axis=0).shape[0] >= 2:
+                    group_r, group_theta = self._fit(group_points)
+                grown = False
+                for i in order[~merged[order]]:
+                    inliers = self._inliers(
+                        lines, i, locations[i], group_r, group_theta
+                    )
+                    if inliers is None:
+                        continue
+                    merged[i] = True
+                    group.append(i)
+                    group_points = np.concatenate([group_points, inliers])
+                    grown = True
+            group_points = np.unique(group_points, axis=0)
+            rs.append(group_r)
+            thetas.append(group_theta)
+            votes.append(lines.votes[group].sum())
+            points.append(group_points)
+        return LineSet(
+            np.array(rs, dtype=float),
+            np.array(thetas, dtype=float),
+            np.array(votes, dtype=float),
+            np.concatenate([np.zeros(shape=(0, 2)), *points]),
+            np.cumsum([0, *(p.shape[0] for p in points)]),
+        )
+
+    def find_lines(self) -> LineSet:
+        """The lines found in all the tiles, merged"""
+        with ProcessPoolExecutor(self.workers) as executor:
+            futures, centres = [], []
+            for tile, origin in self._tiles():
+                futures.append(executor.submit(_find_tile, self.template, tile, origin))
+                centres.append(np.add(origin, np.divide(tile.shape, 2)))
+            tiles_lines = [future.result() for future in futures]
+        # Where each line was found, to compare the lines without points
+        locations = np.concatenate(
+            [np.zeros(shape=(0, 2))]
+            + [np.tile(c, (len(lines), 1)) for c, lines in zip(centres, tiles_lines)]
+        )
+        return self._merge(LineSet.concatenate(tiles_lines), locations)
+
+    def find(self):
+        lines = self.find_lines()
+        self.finder._write(lines)
+        if not self.finder.plot:
+            return
+        self.finder.output.mkdir(parents=True, exist_ok=True)
+        plotter = Plotter(self.finder.data, lines, lines.points.astype(int))
+        plotter.plot(self.finder.output / "found_lines.pdf")
@@ -1,10 +1,24 @@
+from enum import StrEnum
+
+import h5py
+import numpy as np
 from pydantic import BaseModel, NonNegativeFloat
 from pydantic import validate_call
 import pydantic_core
 
 from src.functions import r
 
-from .types import COORDINATES, IMAGE, POINTS, SIGNAL
+from .types import (
+    COORDINATE,
+    COORDINATES,
+    FOUND_LINES,
+    IMAGE,
+    OFFSETS,
+    POINTS,
+    R,
+    SIGNAL,
+    THETA,
+)
 
 
 class Points:
@@ -33,6 +47,34 @@ class Points:
         )
 
 
+class Hits:
+    """Sparse list of hits in x-y space, with an optional signal per hit to
+    weight their votes in r-theta space. `shape` is the size of the x-y space,
+    deduced from the hits if not given. Integer pixel coordinates and signals
+    are stored as floats."""
+
+    @validate_call
+    def __init__(
+        self,
+        points: POINTS | COORDINATES,
+        signal: SIGNAL | COORDINATE | None = None,
+        shape: tuple[int, int] | None = None,
+    ):
+        if signal is not None and signal.shape[0] != points.shape[0]:
+            raise ValueError("There must be one signal value per hit")
+        self.points = np.asarray(points, dtype=float)
+        self.signal = np.asarray(signal, dtype=float) if signal is not None else None
+        self.shape = (
+            shape
+            if shape is not None
+            else tuple(int(n) + 1 for n in points.max(axis=0, initial=0))
+        )
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _, __):
+        return pydantic_core.core_schema.is_instance_schema(cls)
+
+
 class Deviations(BaseModel):
     """The standard deviations of r, theta; the Gaussian used
     to spread the signal across X and Y, the gaussian to generate the signal
@@ -72,6 +114,75 @@ class Thresholds(BaseModel):
     rtheta: float
 
 
+class SpreadsGrid(BaseModel):
+    """Values of Spreads.xy and Spreads.rtheta to sweep over"""
+    xy: list[int]
+    rtheta: list[int]
+
+
+class ThresholdsGrid(BaseModel):
+    """Values of Thresholds.xy and Thresholds.rtheta to sweep over"""
+    xy: list[float]
+    rtheta: list[float]
+
+
+class Precision(StrEnum):
+    """Numeric precision used by the finder pipeline. In 'float32' mode, the
+    point finding and the trigonometry run in single precision and the r-theta
+    accumulator stores its integer counts in the smallest unsigned integer
+    type that can hold them. Accumulators meant to be added together use
+    uint32, to be widened by the caller before summing beyond its range."""
+
+    DOUBLE = "float64"
+    SINGLE = "float32"
+
+    @property
+    def float_dtype(self) -> type[np.floating]:
+        return np.float32 if self is Precision.SINGLE else np.float64
+
+    def accumulator_dtype(
+        self, max_votes: int, weighted: bool = False, summable: bool = False
+    ) -> type:
+        if self is Precision.DOUBLE:
+            return np.float64
+        if weighted:
+            return np.float32
+        if not summable and max_votes <= np.iinfo(np.uint16).max:
+            return np.uint16
+        return np.uint32
+
+
+class RBinning(StrEnum):
+    """How the r axis of the accumulator is binned. 'points' spans the r
+    values of the current points, so the meaning of a bin changes from image
+    to image. 'image' spans -diagonal to +diagonal of the x-y space and
+    'fixed' a given r range: accumulators built with them share their bins
+    and can be added together or reused across runs."""
+
+    POINTS = "points"
+    IMAGE = "image"
+    FIXED = "fixed"
+
+
+class Tolerances(BaseModel):
+    """Maximum differences in r and theta for a found line to match a true
+    line"""
+    r: NonNegativeFloat
+    theta: NonNegativeFloat
+
+
+class FinderConfiguration(BaseModel):
+    """One named set of LinesFinder parameters"""
+    name: str
+    bins: RThetaBins
+    line_width: float
+    spreads: Spreads
+    thresholds: Thresholds
+    precision: Precision = Precision.DOUBLE
+    r_binning: RBinning = RBinning.POINTS
+    r_range: tuple[float, float] | None = None
+
+
 class Line(Points):
     @validate_call
     def __init__(
@@ -87,7 +198,141 @@ class Line(Points):
         self.max_points: POINTS
 
     @validate_call
-    def points_on_line(self, points: POINTS, width: float, image: IMAGE):
+    def points_on_line(
+        self, points: POINTS, width: float, image: IMAGE | None = None
+    ):
         rs = r(xs=points[:, 0], ys=points[:, 1], thetas=self.theta)
         mask = ((self.r - width / 2.0) < rs) & ((self.r + width / 2.0) > rs)
         self.max_points = points[mask]
+
+
+class LineSet:
+    """Columnar set of lines: r, theta and votes are contiguous arrays with
+    one value per line, and the points of all the lines are stored in a
+    single array, the points of line i being points[offsets[i]:offsets[i + 1]].
+    Indexing or iterating gives Line views for compatibility."""
+
+    # Maximum number of point-line distances computed at once
+    DISTANCES_CHUNK = 2**22
+
+    @validate_call
+    def __init__(
+        self,
+        rs: R,
+        thetas: THETA,
+        votes: SIGNAL | None = None,
+        points: POINTS | None = None,
+        offsets: OFFSETS | None = None,
+    ):
+        if thetas.shape != rs.shape:
+            raise ValueError("There must be one theta per r")
+        self.rs = rs
+        self.thetas = thetas
+        self.votes = votes if votes is not None else np.zeros(rs.shape[0])
+        self.points = points if points is not None else np.zeros(shape=(0, 2))
+        self.offsets = (
+            offsets if offsets is not None else np.zeros(rs.shape[0] + 1, dtype=int)
+        )
+        if self.votes.shape != rs.shape or self.offsets.shape[0] != rs.shape[0] + 1:
+            raise ValueError("There must be one vote and one offset per line")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _, __):
+        return pydantic_core.core_schema.is_instance_schema(cls)
+
+    @classmethod
+    def empty(cls) -> "LineSet":
+        return cls(np.zeros(0), np.zeros(0))
+
+    @classmethod
+    def from_lines(cls, lines: tuple[Line, ...]) -> "LineSet":
+        points = [
+            getattr(line, "max_points", np.zeros(shape=(0, 2))) for line in lines
+        ]
+        return cls(
+            np.array([line.r for line in lines], dtype=float),
+            np.array([line.theta for line in lines], dtype=float),
+            points=np.concatenate([np.zeros(shape=(0, 2)), *points]).astype(float),
+            offsets=np.cumsum([0, *(len(p) for p in points)]),
+        )
+
+    @staticmethod
+    def concatenate(line_sets: list["LineSet"]) -> "LineSet":
+        if not line_sets:
+            return LineSet.empty()
+        point_offsets = np.cumsum([0, *(s.points.shape[0] for s in line_sets)])
+        return LineSet(
+            np.concatenate([s.rs for s in line_sets]),
+            np.concatenate([s.thetas for s in line_sets]),
+            np.concatenate([s.votes for s in line_sets]),
+            np.concatenate([s.points for s in line_sets]),
+            np.concatenate(
+                [[0], *(s.offsets[1:] + o for s, o in zip(line_sets, point_offsets))]
+            ),
+        )
+
+    @validate_call
+    def assign_points(self, points: POINTS, width: float) -> None:
+        """Sets the points of each line to the given points within width / 2
+        of it, for as many lines at once as DISTANCES_CHUNK allows"""
+        step = max(1, self.DISTANCES_CHUNK // max(points.shape[0], 1))
+        selected = [np.zeros(shape=(0, 2), dtype=points.dtype)]
+        counts = [np.zeros(0, dtype=int)]
+        for start in range(0, len(self), step):
+            thetas = self.thetas[start : start + step]
+            rs = np.outer(points[:, 0], np.cos(thetas)) + np.outer(
+                points[:, 1], np.sin(thetas)
+            )
+            mask = np.abs(rs - self.rs[start : start + step]) < width / 2.0
+            lines, on_line = np.nonzero(mask.T)
+            selected.append(points[on_line])
+            counts.append(np.bincount(lines, minlength=thetas.shape[0]))
+        self.points = np.concatenate(selected)
+        self.offsets = np.concatenate([[0], np.cumsum(np.concatenate(counts))])
+
+    def __len__(self) -> int:
+        return self.rs.shape[0]
+
+    def __getitem__(self, i: int) -> Line:
+        # Negative indices are resolved here, as they would not slice the points
+        i = range(len(self))[i]
+        # Bypasses the validation of Line.__init__, the values being checked
+        line = Line.__new__(Line)
+        line.binned_coordinates = None
+        line.signal = None
+        line.r = float(self.rs[i])
+        line.theta = float(self.thetas[i])
+        line.max_points = self.points_of(i)
+        return line
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def n_points(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def found(self) -> FOUND_LINES:
+        """One (r, theta, votes) row per line"""
+        return np.stack([self.rs, self.thetas, self.votes], axis=1)
+
+    def points_of(self, i: int) -> POINTS:
+        return self.points[self.offsets[i] : self.offsets[i + 1]]
+
+    def to_hdf5(self, group: h5py.Group) -> None:
+        group["r"] = self.rs
+        group["theta"] = self.thetas
+        group["votes"] = self.votes
+        group["points"] = self.points
+        group["offsets"] = self.offsets
+
+    @classmethod
+    def from_hdf5(cls, group: h5py.Group) -> "LineSet":
+        return cls(
+            group["r"][()],
+            group["theta"][()],
+            group["votes"][()],
+            group["points"][()],
+            group["offsets"][()],
+        )
@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from pydantic import PositiveInt, validate_call
+
+# Marks the end of the items in a queue
+_DONE = object()
+
+
+class _MeteredQueue(queue.Queue):
+    """Bounded queue recording its depth each time an item is put in it"""
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self.puts = 0
+        self.total_depth = 0
+        self.max_depth = 0
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        if item is _DONE:
+            return
+        depth = self.qsize()
+        self.puts += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "items": self.puts,
+            "mean_depth": self.total_depth / self.puts if self.puts else 0.0,
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+        }
+
+
+class Pipeline:
+    """Runs `load`, `compute` and `save` over a sequence of items with the
+    three stages overlapping: the next items are loaded on an I/O thread while
+    the current one is computed, and the results are saved on a background
+    thread. Stages are connected by queues of at most `depth` items, so a slow
+    stage blocks the one before it and memory stays bounded.
+
+    Saving runs on a single thread, off the main thread: `save` must not use
+    matplotlib's pyplot, which is why the Plotter draws on its own canvas."""
+
+    @validate_call
+    def __init__(
+        self,
+        load: Callable[[Any], Any],
+        compute: Callable[[Any], Any],
+        save: Callable[[Any], None],
+        depth: PositiveInt = 2,
+    ):
+        self.load = load
+        self.compute = compute
+        self.save = save
+        self.depth = depth
+        self.loaded: _MeteredQueue
+        self.computed: _MeteredQueue
+        self.busy: dict[str, float] = {}
+        self.errors: list[BaseException] = []
+
+    def _timed(self, stage: str, function: Callable[[Any], Any], item: Any) -> Any:
+        start = time.perf_counter()
+        result = function(item)
+        self.busy[stage] += time.perf_counter() - start
+        return result
+
+    def _drain(self, items: queue.Queue):
+        while items.get() is not _DONE:
+            pass
+
+    def _load_all(self, items: Iterable):
+        try:
+            for item in items:
+                if self.errors:
+                    break
+                self.loaded.put(self._timed("load", self.load, item))
+        except BaseException as error:
+            self.errors.append(error)
+        finally:
+            self.loaded.put(_DONE)
+
+    def _save_all(self):
+        while (item := self.computed.get()) is not _DONE:
+            if self.errors:
+                continue
+            try:
+                self._timed("save", self.save, item)
+            except BaseException as error:
+                self.errors.append(error)
+
+    def run(self, items: Iterable) -> None:
+        self.loaded = _MeteredQueue(self.depth)
+        self.computed = _MeteredQueue(self.depth)
+        self.busy = {"load": 0.0, "compute": 0.0, "save": 0.0}
+        self.errors = []
+        loader = threading.Thread(target=self._load_all, args=(items,), daemon=True)
+        saver = threading.Thread(target=self._save_all, daemon=True)
+        loader.start()
+        saver.start()
+        try:
+            while (item := self.loaded.get()) is not _DONE:
+                if self.errors:
+                    continue
+                self.computed.put(self._timed("compute", self.compute, item))
+        except BaseException as error:
+            self.errors.append(error)
+            self._drain(self.loaded)
+        finally:
+            self.computed.put(_DONE)
+            loader.join()
+            saver.join()
+        if self.errors:
+            raise self.errors[0]
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Depth of the queues feeding the compute and save stages, and the
+        time spent in each stage"""
+        return {
+            "loaded": self.loaded.metrics(),
+            "computed": self.computed.metrics(),
+            "busy": dict(self.busy),
+        }
@@ -1,18 +1,28 @@
 import math
 from pathlib import Path
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib as mpl
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from copy import copy
 from pydantic import validate_call
 
 from ..functions import y
-from ..objects import Line
-from ..types import COORDINATES, IMAGE
+from ..objects import Line, LineSet
+from ..types import ACCUMULATOR, COORDINATES, IMAGE
 
-plt.rcParams.update({"text.usetex": True, "font.family": "Helvetica"})
+mpl.rcParams.update({"text.usetex": True, "font.family": "Helvetica"})
 
 
 class Plotter:
+    """Plots an image with lines and points over it. Figures are drawn with
+    matplotlib's object API on their own Agg canvas rather than through
+    pyplot, whose global state is not thread safe, so plots can be saved
+    from any thread. The points of the lines are drawn only with
+    `show_line_points`, for generated lines, and are then not drawn again
+    among the other points."""
+
     DEFAULT_KWARG = {
         "cmap": "viridis",
     }
@@ -20,60 +30,62 @@ class Plotter:
     @validate_call
     def __init__(
         self,
-        image: IMAGE,
-        lines: tuple[Line, ...] | None,
+        image: IMAGE | ACCUMULATOR,
+        lines: LineSet | tuple[Line, ...] | None,
         points: COORDINATES | None,
+        show_line_points: bool = False,
     ):
         self.image = image
-        self.lines = lines if lines is not None else []
+        if lines is None:
+            lines = LineSet.empty()
+        elif not isinstance(lines, LineSet):
+            lines = LineSet.from_lines(lines)
+        self.lines = lines
         self.points = points if points is not None else np.array([])
+        self.show_line_points = show_line_points
         self.bins = self.image.shape
 
-    def _add_lines_and_points(self):
+    def _add_lines_and_points(self, ax: Axes):
         xs = np.linspace(0, self.bins[0], 100)
-        points_on_a_line = np.zeros(shape=(0, 2), dtype=int)
-        for line in self.lines:
-            ys = y(xs, line.r, line.theta).reshape(-1)
-            plt.plot(
+        for r_, theta_ in zip(self.lines.rs, self.lines.thetas):
+            ys = y(xs, r_, theta_).reshape(-1)
+            ax.plot(
                 xs,
                 ys,
                 linewidth=1,
                 linestyle="--",
-                label=f"$r={round(line.r, 2)}$, "
-                f"$\\theta={round(line.theta / math.pi, 2)}\\pi$",
+                label=f"$r={round(r_, 2)}$, "
+                f"$\\theta={round(theta_ / math.pi, 2)}\\pi$",
+            )
+        points_on_a_line = (
+            self.lines.points.astype(int)
+            if self.show_line_points
+            else np.zeros(shape=(0, 2), dtype=int)
+        )
+        if points_on_a_line.size != 0:
+            ax.scatter(
+                points_on_a_line[:, 0],
+                points_on_a_line[:, 1],
+                marker="o",
+                color="b",
+                s=0.3,
             )
-            if (
-                line.binned_coordinates is not None
-                and line.binned_coordinates.size != 0
-            ):
-                points_on_this_line = line.max_points.astype(int)
-                plt.scatter(
-                    points_on_this_line[:, 0],
-                    points_on_this_line[:, 1],
-                    marker="o",
-                    color="b",
-                    s=0.3,
-                )
-                points_on_a_line = np.concatenate(
-                    [points_on_a_line, points_on_this_line]
-                )
         if self.points.size != 0:
             mask = np.isin(self.points[:, 0], points_on_a_line[:, 0]) * np.isin(
                 self.points[:, 1], points_on_a_line[:, 1]
             )
             not_on_a_line = self.points[~mask]
-            plt.scatter(
+            ax.scatter(
                 not_on_a_line[:, 0],
                 not_on_a_line[:, 1],
                 marker="o",
                 color="r",
                 s=0.4,
-                label="Points not on a line" if self.lines else "Found points",
+                label="Points not on a line" if len(self.lines) else "Found points",
             )
-        ax = plt.gca()
         ax.set_xlim([0, self.bins[0]])
         ax.set_ylim([0, self.bins[1]])
-        plt.legend()
+        ax.legend()
 
     @validate_call
     def plot(
@@ -81,7 +93,9 @@ class Plotter:
         save_as: str | Path,
         **kwargs,
     ) -> None:
-        fig, ax = plt.subplots(figsize=(10, 10 * self.bins[1] / self.bins[0]))
+        fig = Figure(figsize=(10, 10 * self.bins[1] / self.bins[0]))
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
         plt_kwargs = copy(self.DEFAULT_KWARG)
         plt_kwargs.update(kwargs)
         image = ax.imshow(
@@ -91,7 +105,6 @@ class Plotter:
             **plt_kwargs,
         )
         fig.colorbar(image, ax=ax, shrink=0.8)
-        self._add_lines_and_points()
+        self._add_lines_and_points(ax)
         fig.tight_layout()
-        plt.savefig(save_as)
-        plt.close("all")
+        fig.savefig(save_as)
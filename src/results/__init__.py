@@ -0,0 +1,3 @@
+from .resultsstore import ResultsStore
+
+__all__ = ["ResultsStore"]
@@ -0,0 +1,178 @@
+import hashlib
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pandas as pd
+import pydantic_core
+from pydantic import validate_call
+
+from ..objects import LineSet
+from ..types import POINTS
+
+
+class ResultsStore:
+    """Single appendable HDF5 file holding the found lines of many runs.
+
+    'lines' is a chunked and compressed table with one row per line. The
+    points of each line are stored contiguously in 'points', the line's row
+    giving its offset and number of points. Sources are stored once in
+    'sources' and referred to by their index, found through 'source_index',
+    which holds one scalar dataset per source named after its hash."""
+
+    CHUNK = 4096
+    LINE_DTYPE = np.dtype(
+        [
+            ("source", np.int64),
+            ("r", np.float64),
+            ("theta", np.float64),
+            ("votes", np.float64),
+            ("n_points", np.int64),
+            ("points_offset", np.int64),
+            ("parameters", "S32"),
+        ]
+    )
+
+    @validate_call
+    def __init__(self, path: Path):
+        if not path.suffix == ".hdf5":
+            raise ValueError("Can only write HDF5 files")
+        self.path = path
+        if not self.path.is_file():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._create()
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, _, __):
+        return pydantic_core.core_schema.is_instance_schema(cls)
+
+    def _create(self):
+        with h5py.File(self.path, "w") as f:
+            kwargs = {"compression": "gzip", "shuffle": True}
+            f.create_dataset(
+                "lines",
+                shape=(0,),
+                maxshape=(None,),
+                dtype=self.LINE_DTYPE,
+                chunks=(self.CHUNK,),
+                **kwargs,
+            )
+            f.create_dataset(
+                "points",
+                shape=(0, 2),
+                maxshape=(None, 2),
+                dtype=np.float64,
+                chunks=(self.CHUNK, 2),
+                **kwargs,
+            )
+            f.create_dataset(
+                "sources",
+                shape=(0,),
+                maxshape=(None,),
+                dtype=h5py.string_dtype(),
+                chunks=(self.CHUNK,),
+            )
+            f.create_group("source_index")
+
+    @staticmethod
+    def _source_key(source: str) -> str:
+        return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+    @classmethod
+    def _source_index(cls, f: h5py.File, source: str) -> int | None:
+        dataset = f["source_index"].get(cls._source_key(source))
+        return int(dataset[()]) if dataset is not None else None
+
+    @staticmethod
+    def _append(dataset: h5py.Dataset, rows: np.ndarray) -> int:
+        start = dataset.shape[0]
+        dataset.resize(start + rows.shape[0], axis=0)
+        dataset[start:] = rows
+        return start
+
+    @validate_call
+    def append(
+        self,
+        source: str,
+        parameters: str,
+        lines: LineSet,
+    ) -> None:
+        """Appends the lines found in `source` with the parameters hashed as
+        `parameters`"""
+        with h5py.File(self.path, "a") as f:
+            source_index = self._source_index(f, source)
+            if source_index is None:
+                source_index = self._append(
+                    f["sources"], np.array([source], dtype=object)
+                )
+                f["source_index"][self._source_key(source)] = source_index
+
+            rows = np.zeros(len(lines), dtype=self.LINE_DTYPE)
+            rows["source"] = source_index
+            rows["r"] = lines.rs
+            rows["theta"] = lines.thetas
+            rows["votes"] = lines.votes
+            rows["n_points"] = lines.n_points
+            rows["parameters"] = parameters
+            rows["points_offset"] = f["points"].shape[0] + lines.offsets[:-1]
+            self._append(f["points"], lines.points.astype(np.float64))
+            self._append(f["lines"], rows)
+
+    @validate_call
+    def read(
+        self,
+        source: str | None = None,
+        parameters: str | None = None,
+        min_votes: float | None = None,
+        r_range: tuple[float, float] | None = None,
+        theta_range: tuple[float, float] | None = None,
+    ) -> pd.DataFrame:
+        """The lines matching all the given filters, one row per line. The
+        index of the returned table is the line's row in the store, to be
+        given to points()."""
+        # The table is scanned one chunk at a time, so that only the matching
+        # rows are kept in memory
+        selected, indices = [], []
+        with h5py.File(self.path, "r") as f:
+            source_index = (
+                self._source_index(f, source) if source is not None else None
+            )
+            if source is not None and source_index is None:
+                source_index = -1
+            dataset = f["lines"]
+            for start in range(0, dataset.shape[0], self.CHUNK):
+                lines = dataset[start : start + self.CHUNK]
+                mask = np.ones(lines.shape[0], dtype=bool)
+                if source_index is not None:
+                    mask &= lines["source"] == source_index
+                if parameters is not None:
+                    mask &= lines["parameters"] == parameters.encode()
+                if min_votes is not None:
+                    mask &= lines["votes"] >= min_votes
+                if r_range is not None:
+                    mask &= (lines["r"] >= r_range[0]) & (lines["r"] <= r_range[1])
+                if theta_range is not None:
+                    mask &= (lines["theta"] >= theta_range[0]) & (
+                        lines["theta"] <= theta_range[1]
+                    )
+                selected.append(lines[mask])
+                indices.append(start + np.flatnonzero(mask))
+            lines = np.concatenate([np.zeros(0, dtype=self.LINE_DTYPE), *selected])
+            used = np.unique(lines["source"])
+            names = (
+                f["sources"].asstr()[used] if used.size else np.zeros(0, dtype=object)
+            )
+        table = pd.DataFrame(
+            lines, index=np.concatenate([np.zeros(0, dtype=int), *indices])
+        )
+        table["source"] = names[np.searchsorted(used, lines["source"])]
+        table["parameters"] = table["parameters"].str.decode("ascii")
+        return table
+
+    @validate_call
+    def points(self, line: int) -> POINTS:
+        """The points of the line stored at row `line`"""
+        with h5py.File(self.path, "r") as f:
+            row = f["lines"][line]
+            start = row["points_offset"]
+            return f["points"][start : start + row["n_points"]]
@@ -0,0 +1,4 @@
+from .client import LinesClient
+from .server import LinesService
+
+__all__ = ["LinesClient", "LinesService"]
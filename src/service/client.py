@@ -0,0 +1,42 @@
+import io
+import json
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import numpy as np
+from pydantic import validate_call
+
+from ..types import IMAGE
+
+
+class LinesClient:
+    """Thin client of the LinesService"""
+
+    @validate_call
+    def __init__(self, host: str, port: int):
+        self.url = f"http://{host}:{port}"
+
+    def _post(self, body: bytes, content_type: str) -> dict:
+        request = Request(
+            f"{self.url}/find",
+            data=body,
+            headers={"Content-Type": content_type},
+            method="POST",
+        )
+        try:
+            with urlopen(request) as response:
+                return json.loads(response.read())
+        except HTTPError as error:
+            raise ValueError(json.loads(error.read())["error"]) from error
+
+    @validate_call
+    def find(self, data: IMAGE | Path) -> dict:
+        """Sends an image as an array buffer, or the path to an HDF5 file
+        readable by the service."""
+        if isinstance(data, Path):
+            body = json.dumps({"path": str(data.absolute())}).encode()
+            return self._post(body, "application/json")
+        buffer = io.BytesIO()
+        np.save(buffer, data, allow_pickle=False)
+        return self._post(buffer.getvalue(), "application/octet-stream")
@@ -0,0 +1,124 @@
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+from pydantic import PositiveInt, validate_call
+
+from ..linefinder import LinesFinder
+from ..objects import Precision, RThetaBins, Spreads, Thresholds
+
+# Warm finder of a worker process, built once per worker
+_FINDER: LinesFinder | None = None
+
+
+def _init_worker(configuration: dict) -> None:
+    global _FINDER
+    _FINDER = LinesFinder(data=None, output=Path("."), **configuration)
+
+
+def _find(data: np.ndarray | Path) -> dict:
+    result = _FINDER.with_data(data).compute()
+    if result is None:
+        return {"n_points": 0, "lines": []}
+    points, _, _, _, lines = result
+    return {
+        "n_points": points.shape[0],
+        "lines": [
+            {
+                "r": r_,
+                "theta": theta_,
+                "votes": votes,
+                "points": lines.points_of(i).tolist(),
+            }
+            for i, (r_, theta_, votes) in enumerate(lines.found)
+        ],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def _reply(self, status: HTTPStatus, content: dict):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._reply(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+            return
+        self._reply(HTTPStatus.OK, {"status": "ok"})
+
+    def do_POST(self):
+        if self.path != "/find":
+            self._reply(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            if self.headers.get("Content-Type") == "application/json":
+                data = Path(json.loads(body)["path"])
+            else:
+                data = np.load(io.BytesIO(body), allow_pickle=False)
+            result = self.server.executor.submit(_find, data).result()
+        except Exception as error:
+            self._reply(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+            return
+        self._reply(HTTPStatus.OK, result)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], executor: ProcessPoolExecutor):
+        super().__init__(address, _Handler)
+        self.executor = executor
+
+
+class LinesService:
+    """Long-lived line finding service on localhost HTTP. Each worker of the
+    pool keeps a warm LinesFinder, with its configuration and trig tables, and
+    only receives the data.
+
+    POST /find with either an image as a .npy buffer (application/octet-stream)
+    or {"path": "<HDF5 file>"} (application/json). The reply lists the found
+    lines with their r, theta, votes and points."""
+
+    @validate_call
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        workers: PositiveInt | None,
+        thresholds: Thresholds,
+        bins: RThetaBins,
+        line_width: float,
+        spreads: Spreads,
+        precision: Precision = Precision.DOUBLE,
+    ):
+        self.address = (host, port)
+        self.workers = workers
+        self.configuration = {
+            "thresholds": thresholds,
+            "bins": bins,
+            "line_width": line_width,
+            "spreads": spreads,
+            "precision": precision,
+        }
+
+    def serve_forever(self) -> None:
+        with ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.configuration,)
+        ) as executor:
+            with _Server(self.address, executor) as server:
+                print(f"Serving on http://{self.address[0]}:{server.server_port}")
+                try:
+                    server.serve_forever()
+                except KeyboardInterrupt:
+                    pass
@@ -1,7 +1,9 @@
 from numpydantic import NDArray, Shape
+from numpydantic.dtype import Number
 
 BASE_TYPES = (int, float, str)
 IMAGE = NDArray[Shape["* x, * y"], float]
+ACCUMULATOR = NDArray[Shape["* r, * theta"], Number]
 POINTS = NDArray[Shape["* x, 2 y"], float]
 POINT = NDArray[Shape["2 x"], float]
 R_THETA = NDArray[Shape["2 x"], float]
@@ -14,3 +16,5 @@ R = NDArray[Shape["* x"], float]
 SIGNAL = NDArray[Shape["* x"], float]
 POINTS_AND_SIGNAL = NDArray[Shape["* x, 3 y"], float]
 BINS_LIMITS = NDArray[Shape["* x"], float]
+FOUND_LINES = NDArray[Shape["* x, 3 y"], float]
+OFFSETS = NDArray[Shape["* x"], int]
@@ -0,0 +1,95 @@
+from src.argparser.settings import Settings
+from src.linefinder.sweep import Sweep
+
+from pathlib import Path
+
+import h5py
+from pydantic import (
+    AliasChoices,
+    Field,
+    FilePath,
+    PositiveInt,
+    field_validator,
+)
+
+from src.objects import Precision, RThetaBins, SpreadsGrid, ThresholdsGrid
+
+
+class SweepArgs(Settings, cli_prog_name="Sweep"):
+    __OUTPUT = Path("./sweeps")
+
+    bins: list[RThetaBins] = Field(
+        [RThetaBins(r=500, theta=500)],
+        validation_alias="bins",
+    )
+    input: FilePath = Field(
+        description="The HDF5 file containing the raw data",
+        validation_alias="input",
+    )
+    line_width: list[float] = Field(
+        [1.0],
+        description="Values of the line width to sweep over",
+        validation_alias=AliasChoices("line-width", "line_width"),
+    )
+    spreads: SpreadsGrid = Field(
+        SpreadsGrid(xy=[5], rtheta=[15]),
+        validation_alias="spreads",
+    )
+    thresholds: ThresholdsGrid = Field(
+        ThresholdsGrid(xy=[1.0], rtheta=[5.0]),
+        validation_alias="thresholds",
+    )
+    precision: Precision = Field(
+        Precision.DOUBLE,
+        description="Numeric precision of the pipeline",
+        validation_alias="precision",
+    )
+    workers: PositiveInt | None = Field(
+        None,
+        description="Number of processes running the leaves of the sweep."
+        " Defaults to the number of CPUs",
+        validation_alias="workers",
+    )
+    output: Path = Field(
+        "sweep.csv",
+        description="The CSV file to tabulate the found lines in. It will be"
+        " located in ./sweeps/",
+        validation_alias="output",
+    )
+
+    @field_validator("output", mode="before")
+    def handle_output(cls, path: str) -> Path:
+        path = cls.__OUTPUT.default / path
+        if path.is_dir():
+            raise ValueError("Output path must be a file, not a directory")
+        if not path.suffix == ".csv":
+            path = path.with_suffix(".csv")
+        if not path.parent.is_dir():
+            path.parent.mkdir(parents=True)
+        return path
+
+
+def main() -> None:
+    args = SweepArgs()
+    print("Using args", args)
+
+    with h5py.File(args.input, "r") as f:
+        if not "data" in f.keys():
+            raise ValueError("HDF5 file must contain the 'data' key")
+        data = f["data"][()]
+    sweep = Sweep(
+        data=data,
+        output=args.output,
+        bins=args.bins,
+        line_widths=args.line_width,
+        spreads=args.spreads,
+        thresholds=args.thresholds,
+        precision=args.precision,
+        workers=args.workers,
+    )
+    table = sweep.run()
+    print(f"Saved {len(table)} rows in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
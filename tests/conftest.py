@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from src.linefinder import LinesFinder
+from src.objects import RThetaBins, Spreads, Thresholds
+
+
+@pytest.fixture
+def make_finder(tmp_path):
+    """Builds LinesFinders on an empty 100x100 image writing in tmp_path, the
+    keyword arguments overriding any of these defaults"""
+
+    def make_finder(**kwargs) -> LinesFinder:
+        arguments = {
+            "data": np.zeros((100, 100)),
+            "thresholds": Thresholds(xy=1.0, rtheta=5.0),
+            "output": tmp_path,
+            "bins": RThetaBins(r=50, theta=90),
+            "line_width": 1.0,
+            "spreads": Spreads(xy=1, rtheta=2),
+        }
+        return LinesFinder(**(arguments | kwargs))
+
+    return make_finder
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from expects import equal, expect
+
+from src.linefinder import LinesFinder
+from src.objects import Precision, RBinning, RThetaBins
+
+
+def _digitized(finder: LinesFinder, points: np.ndarray) -> np.ndarray:
+    """The accumulator binned with np.digitize, as before the arithmetic
+    binning"""
+    rs = np.outer(points[:, 0], finder.cos_thetas) + np.outer(
+        points[:, 1], finder.sin_thetas
+    )
+    r_bins = np.linspace(
+        rs.min(), rs.max(), finder.bins.r, dtype=finder.precision.float_dtype
+    )
+    binned_rs = np.digitize(rs, r_bins) - 1
+    accumulator = np.zeros((finder.bins.r, finder.bins.theta))
+    np.add.at(accumulator, (binned_rs, np.arange(finder.bins.theta)), 1)
+    return accumulator
+
+
+@pytest.mark.parametrize("precision", list(Precision))
+@pytest.mark.parametrize(
+    "bins", [RThetaBins(r=500, theta=100), RThetaBins(r=7, theta=9)]
+)
+def test_points_binning_equals_digitize(make_finder, precision, bins):
+    finder = make_finder(precision=precision, bins=bins)
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        points = rng.uniform(0, 100, size=(rng.integers(2, 60), 2)).astype(
+            precision.float_dtype
+        )
+        accumulator, _ = finder._create_accumulator(points)
+        np.testing.assert_array_equal(accumulator, _digitized(finder, points))
+
+
+def test_fixed_binning_drops_votes_out_of_range(make_finder):
+    finder = make_finder(r_binning=RBinning.FIXED, r_range=(0.0, 10.0))
+    points = np.array([[5.0, 0.0], [50.0, 0.0]])
+    accumulator, r_bins = finder._create_accumulator(points)
+    expect((float(r_bins[0]), float(r_bins[-1]))).to(equal((0.0, 10.0)))
+    # theta = 0 is the first column: only the first point is within the range
+    expect(float(accumulator[:, 0].sum())).to(equal(1.0))
+
+
+def test_image_binned_accumulators_add_up(make_finder):
+    finder = make_finder(precision=Precision.SINGLE, r_binning=RBinning.IMAGE)
+    points = np.array([[1.0, 2.0], [30.0, 40.0], [70.0, 3.0]], dtype=np.float32)
+    first, r_bins = finder._create_accumulator(points[:2])
+    second, other_r_bins = finder._create_accumulator(points[2:])
+    total, _ = finder._create_accumulator(points)
+    np.testing.assert_array_equal(r_bins, other_r_bins)
+    expect(first.dtype).to(equal(np.uint32))
+    np.testing.assert_array_equal(first + second, total)
+
+
+def test_r_range_only_with_a_fixed_binning(make_finder):
+    with pytest.raises(ValueError):
+        make_finder(r_binning=RBinning.FIXED)
+    with pytest.raises(ValueError):
+        make_finder(r_binning=RBinning.IMAGE, r_range=(0.0, 10.0))
+    with pytest.raises(ValueError):
+        make_finder(r_binning=RBinning.FIXED, r_range=(10.0, 0.0))
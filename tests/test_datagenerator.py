@@ -0,0 +1,37 @@
+import numpy as np
+import scipy.stats as stats
+from expects import be_below, equal, expect
+
+from src.datagenerator.datagenerator import LineGenerator, PointsSpreadGenerator
+from src.objects import Deviations, XYBins
+
+
+def test_generate_columnar_lines():
+    np.random.seed(0)
+    generator = LineGenerator(
+        XYBins(x=300, y=100), 20, Deviations(r=0.0, theta=0.0, spread=0.5, signal=0.0)
+    )
+    lines, points, signal = generator.generate(3)
+    expect(lines.n_points.tolist()).to(equal([20, 20, 20]))
+    # Without deviations, the points are on their line, inside the image
+    for i in range(3):
+        line_points = lines.points_of(i)
+        rs = line_points @ [np.cos(lines.thetas[i]), np.sin(lines.thetas[i])]
+        expect(float(np.abs(rs - lines.rs[i]).max())).to(be_below(1e-9))
+        expect(bool(np.all((line_points >= 0) & (line_points <= [300, 100])))).to(
+            equal(True)
+        )
+    # 10x10 spread points per point, the signal of each point summing to 1
+    expect(points.shape).to(equal((3 * 20 * 100, 2)))
+    np.testing.assert_allclose(signal.reshape(-1, 100).sum(axis=1), 1.0)
+
+
+def test_spread_matches_a_grid_per_point():
+    point = np.array([[3.2, 4.7]])
+    deviations = Deviations(r=0.0, theta=0.0, spread=0.5, signal=0.0)
+    points, signal = PointsSpreadGenerator.spread(point, (300, 100), deviations)
+    xs, ys = np.mgrid[1.7:4.7:10j, 3.2:6.2:10j]
+    grid = np.stack([xs.flatten(), ys.flatten()], axis=1)
+    pdf = stats.multivariate_normal.pdf(grid, mean=point[0], cov=[0.5] * 2)
+    np.testing.assert_allclose(points, grid)
+    np.testing.assert_allclose(signal, pdf / pdf.sum())
@@ -0,0 +1,92 @@
+import math
+
+import h5py
+import numpy as np
+from expects import be_true, equal, expect
+
+from src.evaluation import Evaluator
+from src.objects import (
+    FinderConfiguration,
+    RThetaBins,
+    Spreads,
+    Thresholds,
+    Tolerances,
+)
+
+
+def _evaluator() -> Evaluator:
+    return Evaluator([], [], Tolerances(r=1.0, theta=0.05))
+
+
+def test_flipped_lines_match():
+    # (-5, pi - 0.01) is the line (5, -0.01)
+    found = np.array([[-5.2, math.pi - 0.01]])
+    true = np.array([[5.0, 0.0]])
+    found_indices, true_indices = _evaluator().match(found, true)
+    expect(found_indices.tolist()).to(equal([0]))
+    expect(true_indices.tolist()).to(equal([0]))
+    d_r, d_theta, _ = _evaluator()._differences(
+        found[:, 0], found[:, 1], true[:, 0], true[:, 1]
+    )
+    np.testing.assert_allclose(d_r, [0.2])
+    np.testing.assert_allclose(d_theta, [0.01])
+
+
+def test_lines_outside_the_tolerances_do_not_match():
+    true = np.array([[10.0, 1.0], [20.0, 2.0]])
+    found = np.array([[11.01, 1.0], [20.0, 2.051], [10.5, 1.02]])
+    found_indices, true_indices = _evaluator().match(found, true)
+    expect(found_indices.tolist()).to(equal([2]))
+    expect(true_indices.tolist()).to(equal([0]))
+
+
+def test_the_closest_lines_are_matched_one_to_one():
+    true = np.array([[10.0, 1.0]])
+    found = np.array([[10.5, 1.0], [10.1, 1.0]])
+    found_indices, true_indices = _evaluator().match(found, true)
+    expect(found_indices.tolist()).to(equal([1]))
+    expect(true_indices.tolist()).to(equal([0]))
+
+
+def test_empty_lines():
+    lines = np.array([[10.0, 1.0]])
+    for found, true in [
+        (np.zeros((0, 2)), lines),
+        (lines, np.zeros((0, 2))),
+        (np.zeros((0, 2)), np.zeros((0, 2))),
+    ]:
+        found_indices, true_indices = _evaluator().match(found, true)
+        expect(found_indices.size + true_indices.size).to(equal(0))
+
+
+def test_pareto():
+    runtime = np.array([1.0, 2.0, 2.0, 0.5, 1.0])
+    f1 = np.array([0.8, 0.9, 0.7, 0.1, 0.8])
+    # The third is slower and less accurate than the first. The first and
+    # the last are equal, neither dominates the other
+    expect(Evaluator.pareto(runtime, f1).tolist()).to(
+        equal([True, True, False, True, True])
+    )
+
+
+def test_evaluate(tmp_path):
+    image = np.zeros((60, 60))
+    xs = np.arange(60)
+    image[xs, 20] = 10
+    path = tmp_path / "data.hdf5"
+    with h5py.File(path, "w") as f:
+        f["data"] = image
+        # y = 20, plus a line that is not in the image
+        f["lines"] = np.array([[20.0, math.pi / 2], [40.0, 1.0]])
+    configuration = FinderConfiguration(
+        name="default",
+        bins=RThetaBins(r=120, theta=180),
+        line_width=1.0,
+        spreads=Spreads(xy=1, rtheta=3),
+        thresholds=Thresholds(xy=1.0, rtheta=45.0),
+    )
+    evaluator = Evaluator([path], [configuration], Tolerances(r=1.0, theta=0.05))
+    table = evaluator.evaluate()
+    expect(table.loc[0, "recall"]).to(equal(0.5))
+    expect(table.loc[0, "precision"]).to(equal(1.0))
+    expect(bool(table.loc[0, "pareto"])).to(be_true)
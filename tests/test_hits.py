@@ -0,0 +1,39 @@
+import h5py
+import numpy as np
+import pytest
+from expects import be_above, be_none, equal, expect
+
+from src.objects import Hits
+
+
+def _diagonal(dtype) -> np.ndarray:
+    xs = np.arange(20)
+    return np.stack([xs, xs, np.full(20, 3)], axis=1).astype(dtype)
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.int32, np.float64])
+def test_hits_are_stored_as_floats(dtype):
+    hits = Hits(_diagonal(dtype)[:, :2], _diagonal(dtype)[:, 2])
+    expect(hits.points.dtype).to(equal(np.float64))
+    expect(hits.signal.dtype).to(equal(np.float64))
+    expect(hits.shape).to(equal((20, 20)))
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.float64])
+@pytest.mark.parametrize("with_signal", [False, True])
+def test_hits_dataset(tmp_path, make_finder, dtype, with_signal):
+    rows = _diagonal(dtype) if with_signal else _diagonal(dtype)[:, :2]
+    path = tmp_path / "hits.hdf5"
+    with h5py.File(path, "w") as f:
+        f["hits"] = rows
+        f["hits"].attrs["shape"] = (32, 32)
+    finder = make_finder(data=path)
+    expect(finder.xy_bins).to(equal((32, 32)))
+    if with_signal:
+        np.testing.assert_array_equal(finder.hits.signal, np.full(20, 3.0))
+    else:
+        expect(finder.hits.signal).to(be_none)
+    points, accumulator, _, _, lines = finder.compute()
+    expect(float(accumulator.sum())).to(equal(20 * 90 * (3.0 if with_signal else 1)))
+    expect(len(lines)).to(be_above(0))
+    np.testing.assert_array_equal(points, rows[:, :2].astype(float))
@@ -0,0 +1,70 @@
+import h5py
+import numpy as np
+import pytest
+from expects import equal, expect, have_len
+
+from src.objects import Line, LineSet
+
+
+def _lines() -> LineSet:
+    # Lines x = 2 and y = 3
+    lines = LineSet(np.array([2.0, 3.0]), np.array([0.0, np.pi / 2]), np.ones(2))
+    points = np.array([[2.0, 0.0], [2.0, 3.0], [5.0, 3.0], [7.0, 7.0]])
+    lines.assign_points(points, 1.0)
+    return lines
+
+
+def test_assign_points():
+    lines = _lines()
+    expect(lines.offsets.tolist()).to(equal([0, 2, 4]))
+    expect(lines.n_points.tolist()).to(equal([2, 2]))
+    np.testing.assert_array_equal(lines.points_of(0), [[2.0, 0.0], [2.0, 3.0]])
+    np.testing.assert_array_equal(lines.points_of(1), [[2.0, 3.0], [5.0, 3.0]])
+
+
+def test_assign_points_in_chunks(monkeypatch):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 50, size=(200, 2))
+    lines = LineSet(rng.uniform(0, 50, 30), rng.uniform(0, np.pi, 30))
+    lines.assign_points(points, 2.0)
+    monkeypatch.setattr(LineSet, "DISTANCES_CHUNK", 450)
+    chunked = LineSet(lines.rs, lines.thetas)
+    chunked.assign_points(points, 2.0)
+    np.testing.assert_array_equal(chunked.offsets, lines.offsets)
+    np.testing.assert_array_equal(chunked.points, lines.points)
+
+
+def test_matches_lines():
+    lines = _lines()
+    for i, line in enumerate(lines):
+        expected = Line(lines.rs[i], lines.thetas[i])
+        expected.points_on_line(np.array(lines.points), 1.0)
+        np.testing.assert_array_equal(line.max_points, lines.points_of(i))
+
+
+def test_negative_index():
+    lines = _lines()
+    expect(lines[-1].r).to(equal(3.0))
+    np.testing.assert_array_equal(lines[-1].max_points, lines.points_of(1))
+    with pytest.raises(IndexError):
+        lines[2]
+
+
+def test_concatenate():
+    lines = _lines()
+    concatenated = LineSet.concatenate([lines, LineSet.empty(), lines])
+    expect(concatenated).to(have_len(4))
+    expect(concatenated.offsets.tolist()).to(equal([0, 2, 4, 6, 8]))
+    np.testing.assert_array_equal(concatenated.points_of(3), lines.points_of(1))
+    expect(LineSet.concatenate([])).to(have_len(0))
+
+
+def test_hdf5_round_trip(tmp_path):
+    lines = _lines()
+    with h5py.File(tmp_path / "lines.hdf5", "w") as f:
+        lines.to_hdf5(f.create_group("found"))
+    with h5py.File(tmp_path / "lines.hdf5", "r") as f:
+        read = LineSet.from_hdf5(f["found"])
+    np.testing.assert_array_equal(read.found, lines.found)
+    np.testing.assert_array_equal(read.points, lines.points)
+    np.testing.assert_array_equal(read.offsets, lines.offsets)
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+from expects import be_below, equal, expect
+
+from src.pipeline import Pipeline
+
+
+def test_items_go_through_the_stages_in_order():
+    saved = []
+    pipeline = Pipeline(lambda x: x + 1, lambda x: x * 10, saved.append, depth=1)
+    pipeline.run(range(5))
+    expect(saved).to(equal([10, 20, 30, 40, 50]))
+    metrics = pipeline.metrics()
+    expect(metrics["loaded"]["items"]).to(equal(5))
+    expect(metrics["computed"]["max_depth"]).to(equal(1))
+
+
+def _fail_on(value: int):
+    def stage(x):
+        if x == value:
+            raise ValueError(f"Failed on {x}")
+        return x
+
+    return stage
+
+
+@pytest.mark.parametrize("stage", ["load", "compute", "save"])
+def test_errors_are_raised_by_run(stage):
+    stages = {"load": lambda x: x, "compute": lambda x: x, "save": lambda x: None}
+    stages[stage] = _fail_on(3)
+    pipeline = Pipeline(stages["load"], stages["compute"], stages["save"], depth=1)
+    threads = threading.active_count()
+    with pytest.raises(ValueError, match="Failed on 3"):
+        pipeline.run(range(100))
+    # All the threads are joined, nothing is left running
+    expect(threading.active_count()).to(equal(threads))
+
+
+def test_error_stops_the_loading():
+    loaded = []
+
+    def load(x):
+        loaded.append(x)
+        return x
+
+    pipeline = Pipeline(load, _fail_on(0), lambda x: None, depth=1)
+    with pytest.raises(ValueError):
+        pipeline.run(range(1000))
+    expect(len(loaded)).to(be_below(1000))
@@ -0,0 +1,51 @@
+import sys
+import threading
+
+import matplotlib as mpl
+import numpy as np
+from expects import be_false, be_true, equal, expect
+from matplotlib.figure import Figure
+
+from src.objects import LineSet
+from src.plotter import Plotter
+
+
+def _lines() -> LineSet:
+    return LineSet(
+        np.array([10.0]),
+        np.array([np.pi / 2]),
+        np.array([5.0]),
+        np.array([[1.0, 10.0], [2.0, 10.0]]),
+        np.array([0, 2]),
+    )
+
+
+def test_plot_off_the_main_thread(tmp_path, monkeypatch):
+    # LaTeX is not needed to check how the figure is drawn
+    monkeypatch.setitem(mpl.rcParams, "text.usetex", False)
+    points = np.array([[1, 10], [2, 10], [5, 5]])
+    plotter = Plotter(np.zeros((20, 20)), _lines(), points)
+    errors = []
+
+    def plot():
+        try:
+            plotter.plot(tmp_path / "plot.pdf")
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=plot)
+    thread.start()
+    thread.join()
+    expect(errors).to(equal([]))
+    expect((tmp_path / "plot.pdf").stat().st_size > 0).to(be_true)
+    expect("matplotlib.pyplot" in sys.modules).to(be_false)
+
+
+def test_points_of_the_lines_are_shown_on_demand(monkeypatch):
+    monkeypatch.setitem(mpl.rcParams, "text.usetex", False)
+    points = np.array([[1, 10], [2, 10], [5, 5]])
+    for show_line_points, scattered in [(False, [3]), (True, [2, 1])]:
+        plotter = Plotter(np.zeros((20, 20)), _lines(), points, show_line_points)
+        ax = Figure().subplots()
+        plotter._add_lines_and_points(ax)
+        expect([len(c.get_offsets()) for c in ax.collections]).to(equal(scattered))
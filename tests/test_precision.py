@@ -0,0 +1,37 @@
+import numpy as np
+from expects import be_above, equal, expect
+
+from src.objects import Precision, RThetaBins, Spreads, Thresholds
+
+
+def _image() -> np.ndarray:
+    image = np.zeros((100, 100))
+    xs = np.arange(100)
+    image[xs, xs] = 10
+    image[xs, 30] = 10
+    image[20, xs] = 10
+    return image
+
+
+def test_single_and_double_precision_find_the_same_lines(make_finder):
+    def compute(precision: Precision):
+        return make_finder(
+            data=_image(),
+            thresholds=Thresholds(xy=1.0, rtheta=30.0),
+            bins=RThetaBins(r=200, theta=180),
+            spreads=Spreads(xy=1, rtheta=3),
+            precision=precision,
+        ).compute()
+
+    points64, accumulator64, _, _, lines64 = compute(Precision.DOUBLE)
+    points32, accumulator32, _, _, lines32 = compute(Precision.SINGLE)
+    expect(len(lines64)).to(be_above(0))
+    expect(accumulator32.dtype).to(equal(np.uint16))
+    np.testing.assert_array_equal(points32, points64)
+    # r values on the edge of a bin may fall in the next one in float32
+    expect(int(accumulator32.sum())).to(equal(int(accumulator64.sum())))
+    np.testing.assert_allclose(accumulator32, accumulator64, atol=1)
+    np.testing.assert_allclose(lines32.rs, lines64.rs, atol=1e-4)
+    np.testing.assert_allclose(lines32.thetas, lines64.thetas, atol=1e-6)
+    np.testing.assert_array_equal(lines32.votes, lines64.votes)
+    np.testing.assert_array_equal(lines32.offsets, lines64.offsets)
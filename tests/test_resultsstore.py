@@ -0,0 +1,54 @@
+import numpy as np
+from expects import equal, expect, have_len
+
+from src.objects import LineSet
+from src.results import ResultsStore
+
+
+def _lines(n: int, r0: float) -> LineSet:
+    points = np.arange(2.0 * n).reshape(n, 2)
+    return LineSet(
+        np.arange(n) + r0,
+        np.full(n, 0.5),
+        np.arange(n, dtype=float),
+        points,
+        np.arange(n + 1),
+    )
+
+
+def test_append_and_read_across_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(ResultsStore, "CHUNK", 4)
+    store = ResultsStore(tmp_path / "results.hdf5")
+    store.append("a.hdf5", "p1", _lines(5, 0.0))
+    store.append("b.hdf5", "p1", _lines(3, 100.0))
+    store.append("a.hdf5", "p2", LineSet.empty())
+    store.append("a.hdf5", "p2", _lines(2, 200.0))
+
+    expect(store.read()).to(have_len(10))
+    table = store.read(source="b.hdf5")
+    expect(list(table.index)).to(equal([5, 6, 7]))
+    expect(set(table["source"])).to(equal({"b.hdf5"}))
+    table = store.read(source="a.hdf5", parameters="p2")
+    expect(list(table["r"])).to(equal([200.0, 201.0]))
+    expect(list(store.read(min_votes=2.0).index)).to(equal([2, 3, 4, 7]))
+    expect(store.read(r_range=(100.5, 150.0))).to(have_len(2))
+    expect(store.read(source="c.hdf5")).to(have_len(0))
+
+
+def test_points_of_a_row(tmp_path):
+    store = ResultsStore(tmp_path / "results.hdf5")
+    store.append("a.hdf5", "p1", _lines(3, 0.0))
+    store.append("b.hdf5", "p1", _lines(2, 0.0))
+    np.testing.assert_array_equal(store.points(1), [[2.0, 3.0]])
+    np.testing.assert_array_equal(store.points(4), [[2.0, 3.0]])
+
+
+def test_sources_are_indexed(tmp_path):
+    store = ResultsStore(tmp_path / "results.hdf5")
+    for i in range(50):
+        store.append(f"{i}.hdf5", "p1", _lines(1, float(i)))
+    store.append("7.hdf5", "p2", _lines(1, 100.0))
+    table = store.read(source="7.hdf5")
+    expect(list(table["r"])).to(equal([7.0, 100.0]))
+    expect(list(table.index)).to(equal([7, 50]))
+    expect(store.read(source="50.hdf5")).to(have_len(0))
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from expects import be_none, contain, equal, expect, have_len
+
+from src.cache import StageCache
+
+
+def test_key_depends_on_content():
+    array = np.arange(6.0)
+    expect(StageCache.key(array, 1)).to(equal(StageCache.key(array.copy(), 1)))
+    expect(StageCache.key(array, 1)).not_to(equal(StageCache.key(array + 1, 1)))
+    expect(StageCache.key(array, 1)).not_to(equal(StageCache.key(array, 2)))
+    expect(StageCache.key(array)).not_to(equal(StageCache.key(array.astype(int))))
+
+
+def test_miss_then_hit(tmp_path):
+    cache = StageCache(tmp_path, 2**20)
+    expect(cache.load("points", "key")).to(be_none)
+    cache.store("points", "key", points=np.ones((3, 2)))
+    loaded = cache.load("points", "key")
+    expect(loaded.keys()).to(contain("points"))
+    np.testing.assert_array_equal(loaded["points"], np.ones((3, 2)))
+    expect(list(tmp_path.glob("*.tmp"))).to(have_len(0))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = StageCache(tmp_path, 2**20)
+    for i in range(3):
+        cache.store("stage", str(i), array=np.zeros(1000))
+        os.utime(cache._path("stage", str(i)), (i, i))
+    # Reading the oldest entry makes it the most recently used
+    cache.load("stage", "0")
+    entry_size = cache.entries()[0][1]
+    cache.max_size = 2 * entry_size
+    cache.store("stage", "3", array=np.zeros(1000))
+    expect(cache.load("stage", "1")).to(be_none)
+    expect(cache.load("stage", "0")).not_to(be_none)
+    expect(cache.load("stage", "3")).not_to(be_none)
+    expect(cache.entries()).to(have_len(2))
+
+
+def test_accumulator_is_keyed_on_the_points(tmp_path, make_finder):
+    finder = make_finder(cache=StageCache(tmp_path / "cache", 2**20))
+    points = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+    other_points = np.array([[10.0, 2.0], [3.0, 14.0]])
+    first, _ = finder.accumulate(points)
+    cached, _ = finder.accumulate(points)
+    other, _ = finder.accumulate(other_points)
+    np.testing.assert_array_equal(cached, first)
+    expect(int(other.sum())).to(equal(2 * finder.bins.theta))
+    np.testing.assert_array_equal(other, finder._create_accumulator(other_points)[0])
+
+
+def test_vanished_entries_are_misses(tmp_path, monkeypatch):
+    cache = StageCache(tmp_path, 2**20)
+    cache.store("stage", "kept", array=np.zeros(10))
+    # An entry evicted by another process between the glob and the stat
+    vanished = cache._path("stage", "vanished")
+    glob = Path.glob
+    monkeypatch.setattr(
+        Path, "glob", lambda self, pattern: [*glob(self, pattern), vanished]
+    )
+    expect(cache.entries()).to(have_len(1))
+    expect(cache.load("stage", "vanished")).to(be_none)
+
+
+def test_failed_store_leaves_no_temporary_file(tmp_path):
+    cache = StageCache(tmp_path, 2**20)
+    with pytest.raises(TypeError):
+        cache.store("stage", "key", array=np.array([object()]))
+    expect(list(tmp_path.iterdir())).to(have_len(0))
@@ -0,0 +1,73 @@
+import numpy as np
+from expects import be_above, equal, expect
+
+from src.linefinder import LinesFinder
+from src.linefinder.sweep import Sweep
+from src.objects import RThetaBins, Spreads, SpreadsGrid, Thresholds, ThresholdsGrid
+
+LEAF = ["threshold_rtheta", "spread_rtheta", "line_width"]
+NODE = ["threshold_xy", "spread_xy", "bins_r", "bins_theta"]
+
+
+def _image() -> np.ndarray:
+    image = np.zeros((60, 60))
+    xs = np.arange(60)
+    image[xs, xs] = 10
+    image[xs, 20] = 10
+    return image
+
+
+def _counted(monkeypatch, name: str) -> list:
+    calls = []
+    method = getattr(LinesFinder, name)
+
+    def counted(self, *args):
+        calls.append(args)
+        return method(self, *args)
+
+    monkeypatch.setattr(LinesFinder, name, counted)
+    return calls
+
+
+def test_sweep(tmp_path, monkeypatch, make_finder):
+    find_points = _counted(monkeypatch, "find_points")
+    accumulate = _counted(monkeypatch, "accumulate")
+    sweep = Sweep(
+        data=_image(),
+        output=tmp_path / "sweep.csv",
+        bins=[RThetaBins(r=100, theta=90), RThetaBins(r=60, theta=60)],
+        line_widths=[1.0, 2.0],
+        spreads=SpreadsGrid(xy=[1], rtheta=[2, 3]),
+        thresholds=ThresholdsGrid(xy=[1.0, 5.0], rtheta=[10.0, 20.0]),
+        workers=3,
+    )
+    table = sweep.run()
+
+    # Points once per point finding node, accumulators once per bins of it
+    expect(len(find_points)).to(equal(2))
+    expect(len(accumulate)).to(equal(2 * 2))
+    leaves = table.groupby(NODE + LEAF)
+    expect(leaves.ngroups).to(equal(2 * 2 * 2 * 2 * 2))
+    for _, rows in leaves:
+        expect(len(rows)).to(equal(max(rows["n_lines"].iloc[0], 1)))
+    expect((tmp_path / "sweep.csv").is_file()).to(equal(True))
+
+    # A leaf gives the lines of a finder run with its parameters
+    finder = make_finder(
+        data=_image(),
+        thresholds=Thresholds(xy=1.0, rtheta=20.0),
+        bins=RThetaBins(r=60, theta=60),
+        line_width=2.0,
+        spreads=Spreads(xy=1, rtheta=3),
+    )
+    *_, lines = finder.compute()
+    expect(len(lines)).to(be_above(0))
+    leaf = table[
+        (table.threshold_xy == 1.0)
+        & (table.bins_r == 60)
+        & (table.threshold_rtheta == 20.0)
+        & (table.spread_rtheta == 3)
+        & (table.line_width == 2.0)
+    ]
+    np.testing.assert_allclose(leaf["r"], lines.rs)
+    np.testing.assert_array_equal(leaf["points_on_line"], lines.n_points)
@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+import pytest
+from expects import be_below, equal, expect, have_len
+
+from src.linefinder.tiled import TiledLinesFinder
+from src.objects import (
+    LineSet,
+    RThetaBins,
+    Spreads,
+    Thresholds,
+    Tolerances,
+    XYBins,
+)
+
+
+@pytest.fixture
+def make_tiled(make_finder):
+    def make_tiled(data: np.ndarray, tile: XYBins) -> TiledLinesFinder:
+        finder = make_finder(
+            data=data,
+            thresholds=Thresholds(xy=1.0, rtheta=50.0),
+            bins=RThetaBins(r=100, theta=180),
+            spreads=Spreads(xy=1, rtheta=3),
+        )
+        merge = Tolerances(r=1.0, theta=0.05)
+        return TiledLinesFinder(finder, tile, 10, merge, workers=2)
+
+    return make_tiled
+
+
+@pytest.fixture
+def tiled(make_tiled) -> TiledLinesFinder:
+    return make_tiled(np.zeros((40, 40)), XYBins(x=20, y=20))
+
+
+def _distances(lines: LineSet, i: int) -> np.ndarray:
+    points = lines.points_of(i)
+    normal = np.array([np.cos(lines.thetas[i]), np.sin(lines.thetas[i])])
+    return np.abs(points @ normal - lines.rs[i])
+
+
+def test_merge_across_the_theta_flip(tiled):
+    # x = 5 seen as (5, 0.01) and as (-5.2, pi - 0.005), which is (5.2, -0.005)
+    lines = LineSet(
+        np.array([5.0, -5.2, 30.0]),
+        np.array([0.01, np.pi - 0.005, 1.0]),
+        np.array([30.0, 10.0, 20.0]),
+        np.array(
+            [[5, 0], [5, 1], [5, 2], [5, 2], [5, 3], [5, 4], [0, 30 / math.sin(1)]],
+            dtype=float,
+        ),
+        np.array([0, 3, 6, 7]),
+    )
+    merged = tiled._merge(lines, np.zeros((3, 2)))
+    expect(merged).to(have_len(2))
+    expect(merged.votes.tolist()).to(equal([40.0, 20.0]))
+    expect(merged.n_points.tolist()).to(equal([5, 1]))
+    expect(float(_distances(merged, 0).max())).to(be_below(1e-9))
+
+
+def test_parallel_lines_are_not_merged(tiled):
+    xs = np.arange(10.0)
+    lines = LineSet(
+        np.array([10.0, 13.0]),
+        np.array([np.pi / 2, np.pi / 2]),
+        np.array([10.0, 10.0]),
+        np.concatenate(
+            [np.stack([xs, np.full(10, 10.0)], 1), np.stack([xs, np.full(10, 13.0)], 1)]
+        ),
+        np.array([0, 10, 20]),
+    )
+    expect(tiled._merge(lines, np.zeros((2, 2)))).to(have_len(2))
+
+
+def test_lines_without_points_are_compared_where_they_were_found(tiled):
+    # Far from the origin, a small theta error moves r a lot: the second line
+    # has a very different r, but passes 0.5 away from y = 10 at x = 500
+    theta = np.pi / 2 + 0.01
+    xs = np.arange(0.0, 600.0, 10.0)
+    lines = LineSet(
+        np.array([10.0, 500 * math.cos(theta) + 10.5 * math.sin(theta)]),
+        np.array([np.pi / 2, theta]),
+        np.array([60.0, 30.0]),
+        np.stack([xs, np.full(60, 10.0)], 1),
+        np.array([0, 60, 60]),
+    )
+    locations = np.array([[100.0, 10.0], [500.0, 10.0]])
+    merged = tiled._merge(lines, locations)
+    expect(merged).to(have_len(1))
+    expect(merged.votes.tolist()).to(equal([90.0]))
+
+
+def test_a_long_line_across_tiles_is_found_once(make_tiled):
+    image = np.zeros((1200, 100))
+    xs = np.arange(1200)
+    image[xs, np.round(30 + 0.03 * xs).astype(int)] = 10
+    lines = make_tiled(image, XYBins(x=200, y=100)).find_lines()
+    expect(lines).to(have_len(1))
+    # The normal of y = 30 + 0.03 x, with the points at the pixel centres
+    theta = np.pi / 2 + np.arctan(0.03)
+    r_ = 30 * np.cos(np.arctan(0.03)) + 0.5 * (np.cos(theta) + np.sin(theta))
+    expect(abs(lines.thetas[0] - theta)).to(be_below(1e-3))
+    expect(abs(lines.rs[0] - r_)).to(be_below(0.5))
+
+
+def test_starts_cover_the_image():
+    expect(TiledLinesFinder._starts(40, 20, 4)).to(equal([0, 16, 20]))
+    expect(TiledLinesFinder._starts(10, 20, 4)).to(equal([0]))